@@ -0,0 +1,249 @@
+from __future__ import annotations
+from typing import Iterator, List
+
+COLORS = ("white", "black")
+PIECE_TYPES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+# Bitboard index for every (color, piece type) pair: white pawn = 0 ... black king = 11
+PIECE_INDICES = {(color, piece_type): (i * len(PIECE_TYPES)) + j for i, color in enumerate(COLORS) for j, piece_type in enumerate(PIECE_TYPES)}
+NUM_SQUARES = 64
+
+def iterate_squares(bitboard: int) -> Iterator[int]:
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+def count_squares(bitboard: int) -> int:
+    return bitboard.bit_count()
+
+class Bitboards:
+    """
+    Compact copy of the piece placement on a board. Squares are indexed 0-63 from a1 to h8 (a1 = 0, h1 = 7, a8 = 56),
+    independently of the perspective that the board is displayed from.
+    """
+    def __init__(self) -> None:
+        self.pieces: List[int] = [0] * len(PIECE_INDICES)
+        self.occupancy = {"white": 0, "black": 0}
+        self.occupied: int = 0
+        self.attacks: List[int] = [0] * NUM_SQUARES # Squares attacked by the piece on each square
+        self.attack_maps = {"white": None, "black": None} # Squares attacked by each side, rebuilt from attacks when needed
+
+    def __repr__(self):
+        return "\n".join(f"{color} {piece_type}: {self.pieces[index]:064b}" for (color, piece_type), index in PIECE_INDICES.items())
+
+    def add_piece(self, piece: 'Piece', index: int) -> None:
+        mask = 1 << index
+        self.pieces[PIECE_INDICES[(piece.color, piece.type)]] |= mask
+        self.occupancy[piece.color] |= mask
+        self.occupied |= mask
+
+    def remove_piece(self, piece: 'Piece', index: int) -> None:
+        mask = ~(1 << index)
+        self.pieces[PIECE_INDICES[(piece.color, piece.type)]] &= mask
+        self.occupancy[piece.color] &= mask
+        self.occupied &= mask
+
+    def clear(self) -> None:
+        self.pieces[:] = [0] * len(PIECE_INDICES)
+        self.occupancy = {"white": 0, "black": 0}
+        self.occupied = 0
+        self.attacks[:] = [0] * NUM_SQUARES
+        self.attack_maps = {"white": None, "black": None}
+
+    def reset_attacks(self) -> None:
+        """
+        Recomputes the attack set of every piece from scratch, after pieces were added without update_attacks.
+        """
+        for (color, piece_type), piece_index in PIECE_INDICES.items():
+            for index in iterate_squares(self.pieces[piece_index]):
+                self.attacks[index] = get_piece_attacks(color, piece_type, index, self.occupied)
+        self.attack_maps = {"white": None, "black": None}
+
+    def update_attacks(self, index: int, old_piece: 'Piece', new_piece: 'Piece') -> None:
+        """
+        Updates the attack sets after the piece on a square has changed. Besides the square itself, only the sliders whose
+        rays reach the square can be affected, and only when the square was emptied or filled.
+        """
+        occupied = self.occupied
+        self.attacks[index] = get_piece_attacks(new_piece.color, new_piece.type, index, occupied) if new_piece else 0
+        if (old_piece is None) != (new_piece is None):
+            pieces = self.pieces
+            # Bishops, rooks and queens of both colors, in PIECE_INDICES order
+            diagonal_sliders = pieces[2] | pieces[4] | pieces[8] | pieces[10]
+            orthogonal_sliders = pieces[3] | pieces[4] | pieces[9] | pieces[10]
+            sliders = (get_bishop_attacks(index, occupied) & diagonal_sliders) | (get_rook_attacks(index, occupied) & orthogonal_sliders)
+            for slider in iterate_squares(sliders):
+                mask = 1 << slider
+                attacks = get_bishop_attacks(slider, occupied) if mask & diagonal_sliders else 0
+                if mask & orthogonal_sliders:
+                    attacks |= get_rook_attacks(slider, occupied)
+                self.attacks[slider] = attacks
+        self.attack_maps["white"] = self.attack_maps["black"] = None
+
+    def get_attacked_squares(self, color: str) -> int:
+        attacked = self.attack_maps[color]
+        if attacked is None:
+            attacked = 0
+            for index in iterate_squares(self.occupancy[color]):
+                attacked |= self.attacks[index]
+            self.attack_maps[color] = attacked
+        return attacked
+
+    def get_king_danger_squares(self, color: str) -> int:
+        """
+        Returns the squares that the king of the given color may not step to: every square the opponent attacks, plus the
+        squares behind the king on the ray of a checking slider, which the ray only reaches once the king has stepped away.
+        """
+        opponent_color = "black" if color == "white" else "white"
+        danger = self.get_attacked_squares(opponent_color)
+        king = self.get_bitboard(color, "king")
+        if king and danger & king:
+            king_index = king.bit_length() - 1
+            base = PIECE_INDICES[(opponent_color, "pawn")]
+            for slider in iterate_squares(self.pieces[base + 2] | self.pieces[base + 3] | self.pieces[base + 4]):
+                if self.attacks[slider] & king:
+                    for dest in iterate_squares(KING_ATTACKS[king_index]):
+                        if BETWEEN[slider][dest] & king:
+                            danger |= 1 << dest
+        return danger
+
+    def get_bitboard(self, color: str, piece_type: str) -> int:
+        return self.pieces[PIECE_INDICES[(color, piece_type)]]
+
+    def is_occupied(self, index: int) -> bool:
+        return bool(self.occupied >> index & 1)
+
+    def get_color_at(self, index: int) -> str:
+        mask = 1 << index
+        if self.occupancy["white"] & mask:
+            return "white"
+        elif self.occupancy["black"] & mask:
+            return "black"
+        return None
+
+SQUARE_NAMES = [chr(ord("a") + index % 8) + str(index // 8 + 1) for index in range(NUM_SQUARES)]
+RANKS = [0xFF << (8 * rank) for rank in range(8)]
+FULL_BOARD = (1 << NUM_SQUARES) - 1
+
+def build_jump_table(offsets):
+    table = []
+    for index in range(NUM_SQUARES):
+        file, rank = index % 8, index // 8
+        targets = 0
+        for file_offset, rank_offset in offsets:
+            if 0 <= file + file_offset < 8 and 0 <= rank + rank_offset < 8:
+                targets |= 1 << ((rank + rank_offset) * 8 + file + file_offset)
+        table.append(targets)
+    return table
+
+KNIGHT_ATTACKS = build_jump_table(((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+KING_ATTACKS = build_jump_table(((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)))
+# Squares attacked by a pawn of the given color standing on each square
+PAWN_ATTACKS = {"white": build_jump_table(((-1, 1), (1, 1))), "black": build_jump_table(((-1, -1), (1, -1)))}
+
+# Ray directions as (file step, rank step). The first four increase the square index, so their nearest blocker is the lowest set bit.
+ORTHOGONAL_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+DIAGONAL_DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+RAY_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1), (0, -1), (-1, 0), (1, -1), (-1, -1))
+
+def build_ray_table(file_step, rank_step):
+    table = []
+    for index in range(NUM_SQUARES):
+        file, rank = index % 8 + file_step, index // 8 + rank_step
+        ray = 0
+        while 0 <= file < 8 and 0 <= rank < 8:
+            ray |= 1 << (rank * 8 + file)
+            file += file_step
+            rank += rank_step
+        table.append(ray)
+    return table
+
+RAYS = {direction: build_ray_table(*direction) for direction in RAY_DIRECTIONS}
+POSITIVE_DIRECTIONS = frozenset(((0, 1), (1, 0), (1, 1), (-1, 1)))
+
+def build_between_table():
+    table = [[0] * NUM_SQUARES for _ in range(NUM_SQUARES)]
+    for index in range(NUM_SQUARES):
+        for file_step, rank_step in RAY_DIRECTIONS:
+            file, rank = index % 8 + file_step, index // 8 + rank_step
+            between = 0
+            while 0 <= file < 8 and 0 <= rank < 8:
+                target = rank * 8 + file
+                table[index][target] = between
+                between |= 1 << target
+                file += file_step
+                rank += rank_step
+    return table
+
+# Squares strictly between two squares that share a rank, file or diagonal (0 otherwise)
+BETWEEN = build_between_table()
+
+def get_ray_attacks(index: int, occupied: int, direction) -> int:
+    ray = RAYS[direction][index]
+    blockers = ray & occupied
+    if blockers:
+        if direction in POSITIVE_DIRECTIONS:
+            blocker = (blockers & -blockers).bit_length() - 1
+        else:
+            blocker = blockers.bit_length() - 1
+        ray ^= RAYS[direction][blocker]
+    return ray
+
+def get_rook_attacks(index: int, occupied: int) -> int:
+    attacks = 0
+    for direction in ORTHOGONAL_DIRECTIONS:
+        attacks |= get_ray_attacks(index, occupied, direction)
+    return attacks
+
+def get_bishop_attacks(index: int, occupied: int) -> int:
+    attacks = 0
+    for direction in DIAGONAL_DIRECTIONS:
+        attacks |= get_ray_attacks(index, occupied, direction)
+    return attacks
+
+def get_attackers(bitboards: Bitboards, index: int, color: str, occupied: int) -> int:
+    """
+    Returns the pieces of the given color that attack a square. Pieces missing from the occupied mask are treated as captured.
+    """
+    base = PIECE_INDICES[(color, "pawn")]
+    pieces = bitboards.pieces
+    defending_color = "black" if color == "white" else "white"
+    attackers = PAWN_ATTACKS[defending_color][index] & pieces[base]
+    attackers |= KNIGHT_ATTACKS[index] & pieces[base + 1]
+    attackers |= KING_ATTACKS[index] & pieces[base + 5]
+    queens = pieces[base + 4]
+    attackers |= get_bishop_attacks(index, occupied) & (pieces[base + 2] | queens)
+    attackers |= get_rook_attacks(index, occupied) & (pieces[base + 3] | queens)
+    return attackers & occupied
+
+def is_square_attacked(bitboards: Bitboards, index: int, color: str, occupied: int) -> bool:
+    base = PIECE_INDICES[(color, "pawn")]
+    pieces = bitboards.pieces
+    defending_color = "black" if color == "white" else "white"
+    if PAWN_ATTACKS[defending_color][index] & pieces[base] & occupied:
+        return True
+    if KNIGHT_ATTACKS[index] & pieces[base + 1] & occupied:
+        return True
+    if KING_ATTACKS[index] & pieces[base + 5] & occupied:
+        return True
+    queens = pieces[base + 4]
+    bishops = (pieces[base + 2] | queens) & occupied
+    if bishops and get_bishop_attacks(index, occupied) & bishops:
+        return True
+    rooks = (pieces[base + 3] | queens) & occupied
+    if rooks and get_rook_attacks(index, occupied) & rooks:
+        return True
+    return False
+
+def get_piece_attacks(color: str, piece_type: str, index: int, occupied: int) -> int:
+    if piece_type == "pawn":
+        return PAWN_ATTACKS[color][index]
+    elif piece_type == "knight":
+        return KNIGHT_ATTACKS[index]
+    elif piece_type == "bishop":
+        return get_bishop_attacks(index, occupied)
+    elif piece_type == "rook":
+        return get_rook_attacks(index, occupied)
+    elif piece_type == "queen":
+        return get_bishop_attacks(index, occupied) | get_rook_attacks(index, occupied)
+    return KING_ATTACKS[index]
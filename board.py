@@ -1,17 +1,230 @@
 from __future__ import annotations
+from typing import List, NamedTuple, Optional, Tuple
+from bitboard import PAWN_ATTACKS, PIECE_INDICES, Bitboards, count_squares, is_square_attacked
 from chess_attributes import ChessAttributes
-from piece import Bishop, King, Knight, Pawn, Queen, Rook
+from evaluation import PIECE_SQUARE_SCORES
+from move import UndoRecord
+from move_generator import get_en_passant_target, get_opponent_color
+from piece import PROMOTION_TYPES, Bishop, King, Knight, Pawn, Queen, Rook
+from player import Player
 from square import Square
+from zobrist import CASTLING_KEYS, CASTLING_SQUARES, EN_PASSANT_KEYS, PIECE_KEYS, SIDE_KEY
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FEN_PIECE_TYPES = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": King}
+FEN_LETTERS = {PieceType.type: letter for letter, PieceType in FEN_PIECE_TYPES.items()}
+
+class PositionSnapshot(NamedTuple):
+    """
+    A position recorded by Board.get_snapshot: every piece with the square and flags it had, and the board's own state.
+    """
+    placements: List[Tuple['Piece', int, Optional[bool], bool]] # Piece, square index, has_moved, en passant flag
+    white_pieces: List['Piece']
+    black_pieces: List['Piece']
+    current_turn: str
+    zobrist_key: int
+    rights_key: int
+    score: int
+    halfmove_clock: int
+    fullmove_number: int
+    undo_stack: List[UndoRecord]
+    key_history: List[int]
 
 class Board(ChessAttributes):
-    def __init__(self, perspective: str, white_player: 'Player', black_player: 'Player') -> None:
+    def __init__(self, perspective: str, white_player: 'Player', black_player: 'Player', fen: Optional[str] = None) -> None:
         super().__init__()
         self.perspective = perspective
         self.white_player = white_player
         self.black_player = black_player
-        self._board = [[Square((i, j), perspective) for j in range(self.BOARD_SIZE)] for i in range(self.BOARD_SIZE)]
+        self.bitboards = Bitboards()
+        self.current_turn = "white" # "white" or "black"
+        self.zobrist_key = 0
+        self.rights_key = 0 # Part of the Zobrist key covering castling rights and en passant
+        self.score = 0 # Material and piece-square score from white's point of view, kept up to date by update_square
+        self._board = [[Square((i, j), perspective, self) for j in range(self.BOARD_SIZE)] for i in range(self.BOARD_SIZE)]
+        self.squares = [None] * (self.BOARD_SIZE * self.BOARD_SIZE) # Squares by bitboard index
+        for row in self._board:
+            for square in row:
+                self.squares[square.index] = square
+        self.undo_stack = [] # UndoRecords of the moves made with make_move
+        self.key_history = [] # Zobrist keys of the positions before each move, for repetition detection
+        self.halfmove_clock = 0 # Moves since the last capture or pawn move
+        self.fullmove_number = 1
         self.set_square_colors()
-        self.instantiate_chess_pieces()
+        if fen is None:
+            self.instantiate_chess_pieces()
+            self.reset_zobrist_key()
+        else:
+            self.set_fen(fen)
+
+    @classmethod
+    def from_fen(cls, fen: str, perspective: str = "white", white_player: Optional['Player'] = None, black_player: Optional['Player'] = None) -> Board:
+        """
+        Builds a board set up from a FEN string. Human players are created for any player that is not given.
+        """
+        white_player = white_player or Player(perspective, "white", False)
+        black_player = black_player or Player(perspective, "black", False)
+        board = cls(perspective, white_player, black_player, fen)
+        white_player.assign_board(board)
+        black_player.assign_board(board)
+        return board
+
+    def set_fen(self, fen: str) -> None:
+        """
+        Replaces the position on this board with the one in a FEN string, and forgets the moves made so far. The move
+        counters may be left out. Raises ValueError for a malformed string or an impossible position, in which case the
+        board is left as it was.
+        """
+        fields = fen.split()
+        if not 4 <= len(fields) <= 6:
+            raise ValueError(f"Invalid FEN: {fen}")
+        placement, side_to_move, castling, en_passant = fields[:4]
+        ranks = placement.split("/")
+        if len(ranks) != self.BOARD_SIZE or side_to_move not in ("w", "b") or not (castling == "-" or set(castling) <= set("KQkq")):
+            raise ValueError(f"Invalid FEN: {fen}")
+        try:
+            halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"Invalid move counters in FEN: {fen}") from None
+        current_turn = "white" if side_to_move == "w" else "black"
+
+        # The whole string is checked on a scratch copy of the placement before anything on the board is changed
+        placed = {} # Piece type and color by bitboard index
+        layout = Bitboards()
+        for rank, rank_placement in enumerate(reversed(ranks)):
+            file = 0
+            for letter in rank_placement:
+                if letter.isdigit():
+                    file += int(letter)
+                    continue
+                PieceType = FEN_PIECE_TYPES.get(letter.lower())
+                if PieceType is None or file >= self.BOARD_SIZE:
+                    raise ValueError(f"Invalid piece placement in FEN: {fen}")
+                color = "white" if letter.isupper() else "black"
+                index = rank * self.BOARD_SIZE + file
+                placed[index] = (PieceType, color)
+                layout.pieces[PIECE_INDICES[(color, PieceType.type)]] |= 1 << index
+                layout.occupied |= 1 << index
+                file += 1
+            if file != self.BOARD_SIZE:
+                raise ValueError(f"Invalid piece placement in FEN: {fen}")
+        kings = {color: layout.get_bitboard(color, "king") for color in ("white", "black")}
+        if any(count_squares(king) != 1 for king in kings.values()):
+            raise ValueError(f"FEN needs exactly one king of each color: {fen}")
+        opponent = get_opponent_color(current_turn)
+        if is_square_attacked(layout, kings[opponent].bit_length() - 1, current_turn, layout.occupied):
+            raise ValueError(f"Side not to move is in check in FEN: {fen}")
+        for right, king_index, rook_index in CASTLING_SQUARES:
+            color = "white" if right.isupper() else "black"
+            if right in castling and not (placed.get(king_index) == (King, color) and placed.get(rook_index) == (Rook, color)):
+                raise ValueError(f"Castling right {right} without its king and rook in FEN: {fen}")
+        en_passant_pawn_index = None
+        if en_passant != "-":
+            # The pawn that has just made the double step stands in front of the target square, seen from the side that moved it
+            try:
+                target = self.get_index_from_pos(en_passant)
+            except KeyError:
+                raise ValueError(f"Invalid en passant square in FEN: {fen}") from None
+            target_rank, en_passant_pawn_index = (5, target - self.BOARD_SIZE) if current_turn == "white" else (2, target + self.BOARD_SIZE)
+            if target // self.BOARD_SIZE != target_rank or placed.get(en_passant_pawn_index) != (Pawn, opponent):
+                raise ValueError(f"En passant square without a pawn to capture in FEN: {fen}")
+
+        # The squares are filled without going through update_square, and the bitboards are rebuilt in one pass at the end
+        for square in self.squares:
+            square.load_piece(None)
+        self.bitboards.clear()
+        # The piece lists are cleared in place, because every piece and king keeps a reference to them
+        pieces = {"white": self.white_player.pieces, "black": self.black_player.pieces}
+        pieces["white"].clear()
+        pieces["black"].clear()
+        for index, (PieceType, color) in placed.items():
+            square = self.squares[index]
+            if PieceType == King:
+                piece = King(color, self.perspective, square.coordinates, pieces[color], pieces[get_opponent_color(color)])
+            else:
+                piece = PieceType(color, self.perspective, square.coordinates, pieces[color])
+            # Kings and rooks count as moved unless the castling rights below say otherwise
+            if PieceType in (King, Rook):
+                piece.has_moved = True
+            elif PieceType == Pawn:
+                piece.has_moved = index // self.BOARD_SIZE != (1 if color == "white" else 6)
+            square.load_piece(piece)
+            self.bitboards.add_piece(piece, index)
+            pieces[color].append(piece)
+        for right, king_index, rook_index in CASTLING_SQUARES:
+            if right in castling:
+                self.squares[king_index].piece.has_moved = False
+                self.squares[rook_index].piece.has_moved = False
+        if en_passant_pawn_index is not None:
+            self.squares[en_passant_pawn_index].piece.en_passant_capture.can_be_captured = True
+        self.current_turn = current_turn
+        self.bitboards.reset_attacks()
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+        self.undo_stack.clear()
+        self.key_history.clear()
+        self.reset_zobrist_key()
+        self.score = self.compute_score()
+
+    def get_snapshot(self) -> PositionSnapshot:
+        placements = []
+        for piece in self.white_player.pieces + self.black_player.pieces:
+            placements.append((piece, piece.index, getattr(piece, "has_moved", None), piece.type == "pawn" and piece.en_passant_capture.can_be_captured))
+        return PositionSnapshot(placements, list(self.white_player.pieces), list(self.black_player.pieces), self.current_turn, self.zobrist_key, self.rights_key, self.score, self.halfmove_clock, self.fullmove_number, list(self.undo_stack), list(self.key_history))
+
+    def restore_snapshot(self, snapshot: PositionSnapshot) -> None:
+        """
+        Puts the board back into a position recorded with get_snapshot, moves made since included. The recorded piece
+        objects are put back in place instead of new ones being built, so pieces captured or promoted since return.
+        """
+        for square in self.squares:
+            square.load_piece(None)
+        self.bitboards.clear()
+        # In place, because every piece and king keeps a reference to the lists
+        self.white_player.pieces[:] = snapshot.white_pieces
+        self.black_player.pieces[:] = snapshot.black_pieces
+        for piece, index, has_moved, can_be_captured in snapshot.placements:
+            square = self.squares[index]
+            square.load_piece(piece)
+            piece.coordinates = square.coordinates
+            piece.index = index
+            piece.position = square.position
+            if has_moved is not None:
+                piece.has_moved = has_moved
+            if piece.type == "pawn":
+                piece.en_passant_capture.can_be_captured = can_be_captured
+            self.bitboards.add_piece(piece, index)
+        self.bitboards.reset_attacks()
+        self.current_turn = snapshot.current_turn
+        self.zobrist_key = snapshot.zobrist_key
+        self.rights_key = snapshot.rights_key
+        self.score = snapshot.score
+        self.halfmove_clock = snapshot.halfmove_clock
+        self.fullmove_number = snapshot.fullmove_number
+        self.undo_stack[:] = snapshot.undo_stack
+        self.key_history[:] = snapshot.key_history
+
+    def to_fen(self) -> str:
+        ranks = []
+        for rank in reversed(range(self.BOARD_SIZE)):
+            rank_placement = ""
+            empty_squares = 0
+            for square in self.squares[rank * self.BOARD_SIZE:(rank + 1) * self.BOARD_SIZE]:
+                if (piece := square.piece) is None:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank_placement += str(empty_squares)
+                    empty_squares = 0
+                letter = FEN_LETTERS[piece.type]
+                rank_placement += letter.upper() if piece.color == "white" else letter
+            if empty_squares:
+                rank_placement += str(empty_squares)
+            ranks.append(rank_placement)
+        en_passant_target = get_en_passant_target(self, self.current_turn)
+        en_passant = self.get_pos_from_index(en_passant_target) if en_passant_target is not None else "-"
+        return f"{'/'.join(ranks)} {self.current_turn[0]} {self.get_castling_rights() or '-'} {en_passant} {self.halfmove_clock} {self.fullmove_number}"
 
     def __repr__(self):
         board_representation = []
@@ -24,6 +237,205 @@ class Board(ChessAttributes):
     def board(self):
         return self._board
 
+    def update_square(self, index: int, old_piece: 'Piece', new_piece: 'Piece') -> None:
+        # Every placement change goes through here (moves, captures, castling, promotion and their undoing), so the
+        # key and score are updated by the difference instead of being recomputed
+        if old_piece:
+            piece_index = PIECE_INDICES[(old_piece.color, old_piece.type)]
+            self.bitboards.remove_piece(old_piece, index)
+            self.zobrist_key ^= PIECE_KEYS[piece_index][index]
+            self.score -= PIECE_SQUARE_SCORES[piece_index][index]
+        if new_piece:
+            piece_index = PIECE_INDICES[(new_piece.color, new_piece.type)]
+            self.bitboards.add_piece(new_piece, index)
+            self.zobrist_key ^= PIECE_KEYS[piece_index][index]
+            self.score += PIECE_SQUARE_SCORES[piece_index][index]
+        self.bitboards.update_attacks(index, old_piece, new_piece)
+
+    def switch_turn(self) -> None:
+        self.current_turn = get_opponent_color(self.current_turn)
+        self.zobrist_key ^= SIDE_KEY
+        self.update_rights_key()
+
+    def update_rights_key(self) -> None:
+        """
+        Folds the current castling rights and en passant state into the Zobrist key, replacing the ones folded in before.
+        """
+        rights_key = self.get_en_passant_key()
+        for right in self.get_castling_rights():
+            rights_key ^= CASTLING_KEYS[right]
+        self.zobrist_key ^= self.rights_key ^ rights_key
+        self.rights_key = rights_key
+
+    def reset_zobrist_key(self) -> None:
+        self.zobrist_key = self.compute_zobrist_key()
+        self.rights_key = 0
+        self.update_rights_key()
+
+    def compute_zobrist_key(self) -> int:
+        """
+        Computes the piece and side to move part of the Zobrist key from scratch.
+        """
+        key = SIDE_KEY if self.current_turn == "black" else 0
+        for square in self.squares:
+            if piece := square.piece:
+                key ^= PIECE_KEYS[PIECE_INDICES[(piece.color, piece.type)]][square.index]
+        return key
+
+    def compute_score(self) -> int:
+        """
+        Computes the material and piece-square score from scratch.
+        """
+        score = 0
+        for square in self.squares:
+            if piece := square.piece:
+                score += PIECE_SQUARE_SCORES[PIECE_INDICES[(piece.color, piece.type)]][square.index]
+        return score
+
+    def get_castling_rights(self) -> str:
+        rights = ""
+        for right, king_index, rook_index in CASTLING_SQUARES:
+            king = self.squares[king_index].piece
+            rook = self.squares[rook_index].piece
+            color = "white" if right.isupper() else "black"
+            if king and rook and king.type == "king" and rook.type == "rook" and king.color == color and rook.color == color and not king.has_moved and not rook.has_moved:
+                rights += right
+        return rights
+
+    def get_en_passant_key(self) -> int:
+        # The en passant file only counts when a pawn of the side to move can actually make the capture
+        target = get_en_passant_target(self, self.current_turn)
+        if target is not None and PAWN_ATTACKS[get_opponent_color(self.current_turn)][target] & self.bitboards.get_bitboard(self.current_turn, "pawn"):
+            return EN_PASSANT_KEYS[target % 8]
+        return 0
+
+    def is_square_attacked(self, index: int, color: str) -> bool:
+        """
+        Tells whether the pieces of the given color attack a square, using the incrementally maintained attack maps.
+        """
+        return bool(self.bitboards.get_attacked_squares(color) >> index & 1)
+
+    def get_piece_at(self, index: int) -> 'Piece':
+        return self.squares[index].piece
+
+    def make_move(self, move: 'Move') -> None:
+        """
+        Plays a legal move (as produced by move_generator.generate_legal_moves) without prompting for input. Only what the
+        move changes is pushed onto the undo stack, so that unmake_move can take it back exactly.
+        """
+        src_square = self.squares[move.src]
+        dest_square = self.squares[move.dest]
+        piece = src_square.piece
+        forward = 8 if piece.color == "white" else -8
+        en_passant_target = get_en_passant_target(self, piece.color)
+        en_passant_pawn = self.squares[en_passant_target - forward].piece if en_passant_target is not None else None
+        captured_piece = dest_square.piece
+        captured_index = move.dest
+        captured_list_index = None
+        is_castling = piece.type == "king" and captured_piece is not None and captured_piece.color == piece.color
+        had_moved = getattr(piece, "has_moved", None)
+        could_be_captured = piece.type == "pawn" and piece.en_passant_capture.can_be_captured
+        promoted_piece = None
+        self.key_history.append(self.zobrist_key)
+
+        if is_castling:
+            # The king moves two squares towards the rook, which lands on the square the king crossed
+            rook = captured_piece
+            captured_piece = None
+            direction = 1 if move.dest > move.src else -1
+            self.relocate_piece(piece, src_square, self.squares[move.src + 2 * direction])
+            self.relocate_piece(rook, dest_square, self.squares[move.src + direction])
+            rook.has_moved = True
+        else:
+            if piece.type == "pawn":
+                if move.dest == en_passant_target:
+                    captured_piece = en_passant_pawn
+                    captured_index = move.dest - forward
+                elif move.dest - move.src == 2 * forward:
+                    piece.en_passant_capture.can_be_captured = True
+            if captured_piece:
+                # A piece captured on the destination square is simply replaced there
+                if captured_index != move.dest:
+                    self.squares[captured_index].piece = None
+                captured_list_index = captured_piece.pieces.index(captured_piece)
+                del captured_piece.pieces[captured_list_index]
+            self.relocate_piece(piece, src_square, dest_square)
+            if move.promotion:
+                promoted_piece = piece.promote_pawn(self._board, PROMOTION_TYPES[move.promotion])
+        if had_moved is not None:
+            piece.has_moved = True
+        # The opponent's double step could only be captured on this move
+        if en_passant_pawn is not None:
+            en_passant_pawn.en_passant_capture.can_be_captured = False
+
+        self.undo_stack.append(UndoRecord(move, piece, captured_piece, captured_index, captured_list_index, is_castling, had_moved, could_be_captured, en_passant_pawn, promoted_piece, self.rights_key, self.halfmove_clock))
+        if piece.type == "pawn" or captured_piece:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece.color == "black":
+            self.fullmove_number += 1
+        self.switch_turn()
+
+    def unmake_move(self) -> None:
+        """
+        Takes back the last move made with make_move.
+        """
+        record = self.undo_stack.pop()
+        move, piece = record.move, record.piece
+        src_square = self.squares[move.src]
+        dest_square = self.squares[move.dest]
+        if record.is_castling:
+            direction = 1 if move.dest > move.src else -1
+            rook_square = self.squares[move.src + direction]
+            rook = rook_square.piece
+            self.relocate_piece(piece, self.squares[move.src + 2 * direction], src_square)
+            self.relocate_piece(rook, rook_square, dest_square)
+            # Only unmoved rooks can castle
+            rook.has_moved = False
+        else:
+            if record.promoted_piece:
+                piece.pieces[piece.pieces.index(record.promoted_piece)] = piece
+            captured_piece = record.captured_piece
+            dest_square.piece = captured_piece if record.captured_index == move.dest else None
+            src_square.piece = piece
+            piece.coordinates = src_square.coordinates
+            piece.index = src_square.index
+            piece.position = src_square.position
+            if captured_piece:
+                if record.captured_index != move.dest:
+                    self.squares[record.captured_index].piece = captured_piece
+                captured_piece.pieces.insert(record.captured_list_index, captured_piece)
+        if record.had_moved is not None:
+            piece.has_moved = record.had_moved
+        if piece.type == "pawn":
+            piece.en_passant_capture.can_be_captured = record.could_be_captured
+        if record.en_passant_pawn is not None:
+            record.en_passant_pawn.en_passant_capture.can_be_captured = True
+
+        self.current_turn = get_opponent_color(self.current_turn)
+        # The key history holds the key of the position before the move, which the square updates above have only partly restored
+        self.zobrist_key = self.key_history.pop()
+        self.rights_key = record.rights_key
+        self.halfmove_clock = record.halfmove_clock
+        if piece.color == "black":
+            self.fullmove_number -= 1
+
+    def relocate_piece(self, piece: 'Piece', src_square: 'Square', dest_square: 'Square') -> None:
+        src_square.piece = None
+        dest_square.piece = piece
+        piece.coordinates = dest_square.coordinates
+        piece.index = dest_square.index
+        piece.position = dest_square.position
+
+    def get_repetition_count(self) -> int:
+        """
+        Returns how many times the current position has occurred, counting the current occurrence.
+        """
+        # Positions before the last capture or pawn move cannot repeat the current one
+        recent_keys = self.key_history[max(0, len(self.key_history) - self.halfmove_clock):] if self.halfmove_clock else []
+        return recent_keys.count(self.zobrist_key) + 1
+
     def set_square_colors(self):
         for row in range(self.BOARD_SIZE):
             for col in range(self.BOARD_SIZE):
@@ -1,11 +1,19 @@
 from __future__ import annotations
+import argparse
 from typing import Optional
 from board import Board
 from chess_attributes import ChessAttributes
+from game import Game
+from opening_book import OpeningBook, load_default_book
+from parallel_search import ParallelSearch
 from player import Player
+from pondering import Ponderer
+from renderer import BoardRenderer
+from tablebase import Tablebase, load_default_tablebase
+from time_control import GameClock
 
 class Chess(ChessAttributes):
-    def __init__(self) -> None:
+    def __init__(self, incremental_display: bool = False, book_path: Optional[str] = None, tablebase_path: Optional[str] = None, num_workers: int = 1, base_time: Optional[float] = None, increment: float = 0.0, ponder: bool = True) -> None:
         super().__init__()
         self.perspective: str = "white" # "white" or "black"
         self.is_cpu_opponent: bool = False
@@ -13,17 +21,43 @@ class Chess(ChessAttributes):
         self.white_player: Optional['Player'] = None
         self.black_player: Optional['Player'] = None
         self.current_turn: str = "white" # "white" or "black"
-        self.winner: Optional[str] = None # "white", "black", "stalemate" or None
+        self.winner: Optional[str] = None # "white", "black", "stalemate", "draw" or None
         self.get_game_settings()
-        self.instantiate_players()
-        self._board :'Board' = Board(self.perspective, self.white_player, self.black_player)
-        self.white_player.assign_board(self._board)
-        self.black_player.assign_board(self._board)
-        self.run_game_loop()
+        # The computer plays from the opening book and tablebase generated next to the engine, if there are any
+        self.opening_book: Optional['OpeningBook'] = OpeningBook(book_path) if book_path else load_default_book()
+        self.tablebase: Optional['Tablebase'] = Tablebase(tablebase_path) if tablebase_path else load_default_tablebase()
+        self.game: 'Game' = Game(self.perspective, self.is_cpu_opponent, self.cpu_difficulty, opening_book=self.opening_book, tablebase=self.tablebase)
+        self.white_player = self.game.white_player
+        self.black_player = self.game.black_player
+        self._board :'Board' = self.game.board
+        # Both players draw on the same terminal, so they share one renderer and its record of what is on screen
+        self.renderer = BoardRenderer(self.perspective, incremental_display)
+        self.white_player.renderer = self.black_player.renderer = self.renderer
+        self.parallel_search: Optional['ParallelSearch'] = ParallelSearch(num_workers) if self.is_cpu_opponent and num_workers > 1 else None
+        self.white_player.parallel_search = self.black_player.parallel_search = self.parallel_search
+        # Untimed unless a base time (in seconds) is given
+        self.clock: Optional['GameClock'] = GameClock(base_time, increment) if base_time is not None else None
+        self.white_player.clock = self.black_player.clock = self.clock
+        if self.is_cpu_opponent and ponder:
+            # The CPU thinks while the human chooses a move
+            cpu_player = self.black_player if self.perspective == "white" else self.white_player
+            self.white_player.ponderer = self.black_player.ponderer = Ponderer(cpu_player)
+        try:
+            self.run_game_loop()
+        finally:
+            if self.white_player.ponderer is not None:
+                self.white_player.ponderer.stop()
+            self.renderer.close()
+            if self.opening_book is not None:
+                self.opening_book.close()
+            if self.tablebase is not None:
+                self.tablebase.close()
+            if self.parallel_search is not None:
+                self.parallel_search.close()
         self.announce_winner()
 
     @property
-    def board(self) -> None:
+    def board(self) -> 'Board':
         return self._board
     
     def get_game_settings(self) -> None:
@@ -63,30 +97,52 @@ class Chess(ChessAttributes):
         if self.is_cpu_opponent:
             get_cpu_difficulty(self)
 
-    def instantiate_players(self) -> None:
-        if self.perspective == "white":
-            self.white_player = Player(self.perspective, "white", False)
-            self.black_player = Player(self.perspective, "black", self.is_cpu_opponent, self.cpu_difficulty)
-            self.current_turn = "white"
-        else:
-            self.black_player = Player(self.perspective, "black", False)
-            self.white_player = Player(self.perspective, "white", self.is_cpu_opponent, self.cpu_difficulty)
-            self.current_turn = "white"
-
     def run_game_loop(self) -> None:
         while not self.winner:
-            if self.current_turn == "white":
-                self.white_player.take_turn()
-                self.current_turn = "black"
-            elif self.current_turn == "black":
-                self.black_player.take_turn()
-                self.current_turn = "white"
+            if self.is_game_over():
+                break
+            player = self.white_player if self.current_turn == "white" else self.black_player
+            if self.clock is not None:
+                print(f"White {self.clock.format('white')} - Black {self.clock.format('black')}")
+                self.clock.start(self.current_turn)
+            player.take_turn()
+            if self.clock is not None:
+                self.clock.stop()
+                if self.clock.remaining[self.current_turn] <= 0:
+                    print(f"{self.current_turn.title()} ran out of time.")
+                    self.winner = self.get_result_on_time(self.current_turn)
+                    break
+            self.current_turn = "black" if self.current_turn == "white" else "white"
+
+    def get_result_on_time(self, color: str) -> str:
+        # Running out of time loses, unless the opponent has nothing left to mate with but a king
+        opponent = "black" if color == "white" else "white"
+        bitboards = self.board.bitboards
+        return "draw" if bitboards.occupancy[opponent] == bitboards.get_bitboard(opponent, "king") else opponent
+
+    def is_game_over(self) -> bool:
+        self.winner = self.game.result()
+        return self.winner is not None
 
     def announce_winner(self) -> None:
         if self.winner == "white" or self.winner == "black":
             print(f"{self.winner.title()} player wins.")
         elif self.winner == "stalemate":
             print("Neither player wins due to stalemate.")
+        elif self.winner == "draw":
+            print("The game is drawn.")
 
-chess = Chess()
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play chess in the terminal.")
+    parser.add_argument("--incremental-display", action="store_true", help="keep the board at the top of the screen and only redraw the squares that change")
+    parser.add_argument("--book", default=None, help="opening book file for the computer (opening_book.bin next to the engine by default)")
+    parser.add_argument("--tablebase", default=None, help="endgame tablebase file for the computer (tablebase.bin next to the engine by default)")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes the computer searches with")
+    parser.add_argument("--time", type=float, default=None, help="minutes on each player's clock (untimed by default)")
+    parser.add_argument("--increment", type=float, default=0.0, help="seconds added to a player's clock after each move")
+    parser.add_argument("--no-ponder", action="store_true", help="do not let the computer think while you choose your move")
+    args = parser.parse_args()
+    Chess(args.incremental_display, args.book, args.tablebase, args.workers, args.time * 60 if args.time is not None else None, args.increment, not args.no_ponder)
 
+if __name__ == "__main__":
+    main()
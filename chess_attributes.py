@@ -1,29 +1,71 @@
 from typing import Tuple
+from bitboard import SQUARE_NAMES
+
+BOARD_SIZE = 8
+PERSPECTIVES = ("white", "black")
+
+def compute_index(row: int, col: int, perspective: str) -> int:
+    # Row 0 is the far side of the board from the player, so it holds the 8th rank for white and the 1st rank for black
+    if perspective == "white":
+        return (BOARD_SIZE - 1 - row) * BOARD_SIZE + col
+    else:
+        return row * BOARD_SIZE + (BOARD_SIZE - 1 - col)
+
+def build_coords_by_index(perspective: str):
+    coords_by_index = [None] * (BOARD_SIZE * BOARD_SIZE)
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            coords_by_index[compute_index(row, col, perspective)] = (row, col)
+    return coords_by_index
+
+# Lookup tables between the three ways of naming a square: grid coordinates (row, col) for each perspective,
+# algebraic positions ("e4") and bitboard indices (a1 = 0, h8 = 63)
+INDEX_BY_COORDS = {perspective: [[compute_index(row, col, perspective) for col in range(BOARD_SIZE)] for row in range(BOARD_SIZE)] for perspective in PERSPECTIVES}
+COORDS_BY_INDEX = {perspective: build_coords_by_index(perspective) for perspective in PERSPECTIVES}
+POSITIONS_BY_COORDS = {perspective: [[SQUARE_NAMES[index] for index in row] for row in INDEX_BY_COORDS[perspective]] for perspective in PERSPECTIVES}
+# Positions typed in upper case ("E4") map to the same square
+INDEX_BY_POSITION = {**{name.upper(): index for index, name in enumerate(SQUARE_NAMES)}, **{name: index for index, name in enumerate(SQUARE_NAMES)}}
+COORDS_BY_POSITION = {perspective: {position: COORDS_BY_INDEX[perspective][index] for position, index in INDEX_BY_POSITION.items()} for perspective in PERSPECTIVES}
 
 class ChessAttributes:
-    def __init__(self):
-        self.BOARD_SIZE = 8
+    __slots__ = ()
+    BOARD_SIZE = BOARD_SIZE
 
     def get_pos_from_coords(self, coordinates: Tuple[int, int], perspective: str) -> str:
         square_y, square_x = coordinates
+        if 0 <= square_y < BOARD_SIZE and 0 <= square_x < BOARD_SIZE:
+            return POSITIONS_BY_COORDS[perspective][square_y][square_x]
+        # Coordinates just off the board are used for the rank and file labels of the display
         return self.get_column_pos(square_x, perspective) + self.get_row_pos(square_y, perspective)
-        
+
     def get_coords_from_pos(self, position: str, perspective: str) -> Tuple[int, int]:
-        square_x, square_y = position
-        return (self.get_row_coord(square_y, perspective), self.get_col_coord(square_x, perspective))
-        
+        return COORDS_BY_POSITION[perspective][position]
+
+    def get_index_from_pos(self, position: str) -> int:
+        return INDEX_BY_POSITION[position]
+
+    def get_index_from_coords(self, coordinates: Tuple[int, int], perspective: str) -> int:
+        square_y, square_x = coordinates
+        return INDEX_BY_COORDS[perspective][square_y][square_x]
+
+    def get_coords_from_index(self, index: int, perspective: str) -> Tuple[int, int]:
+        return COORDS_BY_INDEX[perspective][index]
+
+    def get_pos_from_index(self, index: int) -> str:
+        return SQUARE_NAMES[index]
+
     def get_row_pos(self, square_y: int, perspective: str) -> str:
         if perspective == "white":
             return str(self.BOARD_SIZE - square_y)
         else:
             return str(square_y + 1)
-    
+
     def get_column_pos(self, square_x: int, perspective: str) -> str:
         if perspective == "white":
             return chr(ord("a") + square_x)
         else:
             return chr(ord("a") + self.BOARD_SIZE - (square_x + 1))
-    
+
     def get_row_coord(self, square_y: str, perspective: str) -> int:
         if perspective == "white":
             return self.BOARD_SIZE - int(square_y)
@@ -34,4 +76,4 @@ class ChessAttributes:
         if perspective == "white":
             return ord(square_x) - ord("a")
         else:
-            return self.BOARD_SIZE - (ord(square_x) - ord("a")) - 1
\ No newline at end of file
+            return self.BOARD_SIZE - (ord(square_x) - ord("a")) - 1
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from bitboard import NUM_SQUARES, PIECE_INDICES
+
+PIECE_VALUES = {"pawn": 100, "knight": 320, "bishop": 330, "rook": 500, "queen": 900, "king": 0}
+
+# Bonuses for standing on each square, from white's side of the board and listed from a1 to h8. Black uses the same
+# tables mirrored top to bottom.
+PIECE_SQUARE_TABLES = {
+    "pawn": (
+          0,   0,   0,   0,   0,   0,   0,   0,
+          5,  10,  10, -20, -20,  10,  10,   5,
+          5,  -5, -10,   0,   0, -10,  -5,   5,
+          0,   0,   0,  20,  20,   0,   0,   0,
+          5,   5,  10,  25,  25,  10,   5,   5,
+         10,  10,  20,  30,  30,  20,  10,  10,
+         50,  50,  50,  50,  50,  50,  50,  50,
+          0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    "knight": (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    "bishop": (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    "rook": (
+          0,   0,   0,   5,   5,   0,   0,   0,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+          5,  10,  10,  10,  10,  10,  10,   5,
+          0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    "queen": (
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+          0,   0,   5,   5,   5,   5,   0,  -5,
+         -5,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+    ),
+    "king": (
+         20,  30,  10,   0,   0,  10,  30,  20,
+         20,  20,   0,   0,   0,   0,  20,  20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+    ),
+}
+
+# Material plus square bonus of every piece on every square, positive for white and negative for black, indexed like
+# PIECE_KEYS. The board adds and subtracts these as pieces come and go, so its score never needs a full rescan.
+PIECE_SQUARE_SCORES = [
+    [PIECE_VALUES[piece_type] + PIECE_SQUARE_TABLES[piece_type][index] if color == "white" else -(PIECE_VALUES[piece_type] + PIECE_SQUARE_TABLES[piece_type][index ^ 56]) for index in range(NUM_SQUARES)]
+    for (color, piece_type) in PIECE_INDICES
+]
@@ -0,0 +1,138 @@
+from __future__ import annotations
+from typing import List, Optional, Union
+from board import Board
+from chess_attributes import ChessAttributes
+from move import Move
+from move_generator import generate_legal_moves, get_opponent_color, is_in_check
+from player import Player
+
+FIFTY_MOVE_LIMIT = 100 # Half moves without a capture or pawn move before the game is drawn
+
+class Game(ChessAttributes):
+    """
+    A game of chess without any terminal I/O, for driving games programmatically. Moves are given as Move objects or as
+    strings such as "e2e4", "e7e8q" or "e1h1" (castling is entered as the king moving onto its rook).
+    """
+    def __init__(self, perspective: str = "white", is_cpu_opponent: bool = False, cpu_difficulty: Optional[str] = None, fen: Optional[str] = None, opening_book: Optional['OpeningBook'] = None, tablebase: Optional['Tablebase'] = None) -> None:
+        super().__init__()
+        self.perspective: str = perspective # Color of the human player, "white" or "black"
+        self.is_cpu_opponent: bool = is_cpu_opponent
+        self.cpu_difficulty: Optional[str] = cpu_difficulty # "easy", "medium", "hard" or None
+        self.white_player: Optional['Player'] = None
+        self.black_player: Optional['Player'] = None
+        self.winner: Optional[str] = None # Set when a player resigns
+        self.moves: List[Move] = []
+        self.instantiate_players()
+        self._board: 'Board' = Board(self.perspective, self.white_player, self.black_player, fen) # Starting position unless a FEN string is given
+        self.white_player.assign_board(self._board)
+        self.black_player.assign_board(self._board)
+        self.white_player.opening_book = self.black_player.opening_book = opening_book
+        self.white_player.tablebase = self.black_player.tablebase = tablebase
+
+    @property
+    def board(self) -> 'Board':
+        return self._board
+
+    @property
+    def current_turn(self) -> str:
+        return self._board.current_turn
+
+    def instantiate_players(self) -> None:
+        if self.perspective == "white":
+            self.white_player = Player(self.perspective, "white", False)
+            self.black_player = Player(self.perspective, "black", self.is_cpu_opponent, self.cpu_difficulty)
+        else:
+            self.black_player = Player(self.perspective, "black", False)
+            self.white_player = Player(self.perspective, "white", self.is_cpu_opponent, self.cpu_difficulty)
+
+    def get_player(self, color: str) -> 'Player':
+        return self.white_player if color == "white" else self.black_player
+
+    def legal_moves(self) -> List[Move]:
+        if self.winner:
+            return []
+        return generate_legal_moves(self._board, self.current_turn)
+
+    def push(self, move: Union[Move, str]) -> Move:
+        if isinstance(move, str):
+            move = self.parse_move(move)
+        elif move not in self.legal_moves():
+            raise ValueError(f"Illegal move: {move}")
+        self._board.make_move(move)
+        self.moves.append(move)
+        return move
+
+    def pop(self) -> Move:
+        self._board.unmake_move()
+        self.winner = None
+        return self.moves.pop()
+
+    def parse_move(self, text: str) -> Move:
+        legal_moves = self.legal_moves()
+        for move in legal_moves:
+            if str(move) == text:
+                return move
+        # Also accept castling written as the king's two-square step
+        for move in legal_moves:
+            if self.is_castling_move(move) and move.src_pos == text[:2] and text[2:4] == self.get_castling_destination(move):
+                return move
+        raise ValueError(f"Illegal move: {text}")
+
+    def is_castling_move(self, move: Move) -> bool:
+        rook = self._board.get_piece_at(move.dest)
+        return rook is not None and rook.color == self.current_turn
+
+    def get_castling_destination(self, move: Move) -> str:
+        direction = 1 if move.dest > move.src else -1
+        return Move(move.src, move.src + 2 * direction).dest_pos
+
+    def get_uci(self, move: Move) -> str:
+        """
+        Returns a move of the side to move in UCI notation, which writes castling as the king's two-square step. The
+        result is read back by parse_move.
+        """
+        if self.is_castling_move(move):
+            return move.src_pos + self.get_castling_destination(move)
+        return str(move)
+
+    def get_uci_moves(self) -> List[str]:
+        # Each move is converted in the position it was played from, so the moves are taken back and replayed
+        for _ in self.moves:
+            self._board.unmake_move()
+        uci_moves = []
+        for move in self.moves:
+            uci_moves.append(self.get_uci(move))
+            self._board.make_move(move)
+        return uci_moves
+
+    def play_cpu_move(self, difficulty: Optional[str] = None) -> Move:
+        """
+        Searches for the side to move and plays the chosen move. Either side can be played by the CPU.
+        """
+        player = self.get_player(self.current_turn)
+        move = player.choose_cpu_move(difficulty or player.difficulty or self.cpu_difficulty or "medium")
+        return self.push(move)
+
+    def resign(self, color: str) -> None:
+        self.winner = get_opponent_color(color)
+
+    def result(self) -> Optional[str]:
+        """
+        Returns "white" or "black" for the winning side, "stalemate" or "draw" when neither player wins, or None while the game is still going.
+        """
+        if self.winner:
+            return self.winner
+        if not self.legal_moves():
+            return get_opponent_color(self.current_turn) if is_in_check(self._board, self.current_turn) else "stalemate"
+        if self._board.halfmove_clock >= FIFTY_MOVE_LIMIT or self._board.get_repetition_count() >= 3 or self.is_insufficient_material():
+            return "draw"
+        return None
+
+    def is_insufficient_material(self) -> bool:
+        bitboards = self._board.bitboards
+        for color in ("white", "black"):
+            for piece_type in ("pawn", "rook", "queen"):
+                if bitboards.get_bitboard(color, piece_type):
+                    return False
+        # Kings with at most one minor piece between them cannot force checkmate
+        return (bitboards.occupied.bit_count() - 2) <= 1
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+from board import START_FEN, Board
+from move import Move
+from selfplay import read_selfplay_games
+
+# File layout: a file header, then for every game a game header followed by one 16-bit Move.encode() code per ply.
+# All fields are little-endian, and every record has an even length so that the whole file can be read as 16-bit words.
+MAGIC = b"CHGD"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH") # Magic, version, reserved
+GAME_HEADER = struct.Struct("<HBB") # Number of plies, result code, reserved
+MAX_PLIES = 0xFFFF
+RESULT_CODES = {None: 0, "unfinished": 0, "white": 1, "black": 2, "draw": 3, "stalemate": 4}
+RESULTS_BY_CODE = {0: None, 1: "white", 2: "black", 3: "draw", 4: "stalemate"}
+
+class GameDatabaseWriter:
+    """
+    Appends games to a database file, creating it with its file header if it does not exist yet.
+    """
+    def __init__(self, path: str) -> None:
+        self.file: BinaryIO = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, 0))
+        self.num_games = 0
+
+    def __enter__(self) -> GameDatabaseWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def add_game(self, moves: Iterable[Move], result: Optional[str] = None) -> None:
+        """
+        Stores a game played from the starting position, given as its moves and the result as reported by Game.result().
+        """
+        codes = array("H", (move.encode() for move in moves))
+        if len(codes) > MAX_PLIES:
+            raise ValueError(f"Game too long to store: {len(codes)} plies")
+        if sys.byteorder == "big":
+            codes.byteswap()
+        self.file.write(GAME_HEADER.pack(len(codes), RESULT_CODES[result], 0))
+        self.file.write(codes.tobytes())
+        self.num_games += 1
+
+class GameDatabase:
+    """
+    Read-only view of a database file through mmap. Games are read straight from the mapped file: iterating yields each
+    game's result and a memoryview of its 16-bit move codes, without parsing or copying the moves. The view is only
+    valid until the iteration moves on or stops.
+    """
+    def __init__(self, path: str) -> None:
+        if sys.byteorder == "big":
+            raise RuntimeError("Game databases are read as little-endian 16-bit words")
+        with open(path, "rb") as database_file:
+            header = database_file.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size or FILE_HEADER.unpack(header)[:2] != (MAGIC, VERSION):
+                raise ValueError(f"Not a game database: {path}")
+            # The mapping stays valid after the file is closed
+            self.map = mmap.mmap(database_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # The file read as 16-bit words, which is what the move codes are
+        self.words = memoryview(self.map).cast("H")
+        self.offsets: Optional[array] = None # Word offset of every game header, built on first random access
+
+    def __enter__(self) -> GameDatabase:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.words.release()
+        self.map.close()
+
+    def __iter__(self) -> Iterator[Tuple[Optional[str], memoryview]]:
+        words = self.words
+        offset = FILE_HEADER.size // 2
+        while offset < len(words):
+            num_plies, result_code, _ = GAME_HEADER.unpack_from(self.map, offset * 2)
+            offset += GAME_HEADER.size // 2
+            codes = words[offset:offset + num_plies]
+            try:
+                yield RESULTS_BY_CODE[result_code], codes
+            finally:
+                # Views of the map must be released before it can be closed, also when the caller stops iterating early
+                codes.release()
+            offset += num_plies
+
+    def __len__(self) -> int:
+        return len(self.get_offsets())
+
+    def get_offsets(self) -> array:
+        if self.offsets is None:
+            self.offsets = array("Q")
+            offset = FILE_HEADER.size // 2
+            while offset < len(self.words):
+                self.offsets.append(offset)
+                offset += GAME_HEADER.size // 2 + self.words[offset]
+        return self.offsets
+
+    def get_game(self, game_number: int) -> Tuple[Optional[str], List[Move]]:
+        offset = self.get_offsets()[game_number]
+        num_plies, result_code, _ = GAME_HEADER.unpack_from(self.map, offset * 2)
+        start = offset + GAME_HEADER.size // 2
+        return RESULTS_BY_CODE[result_code], [Move.decode(code) for code in self.words[start:start + num_plies]]
+
+def replay_games(database: GameDatabase, board: Optional[Board] = None) -> Iterator[Tuple[Optional[str], Board]]:
+    """
+    Replays every game of the database on one board, yielding the result and the board in its final position.
+
+    No pieces or moves are built per game: the board returns to the starting position by restoring a snapshot of its
+    own pieces, and each move code is decoded once for the whole database. What remains per ply is the UndoRecord that
+    make_move keeps.
+    """
+    if board is None:
+        board = Board.from_fen(START_FEN)
+    else:
+        board.set_fen(START_FEN)
+    start = board.get_snapshot()
+    moves = {} # Decoded moves by code
+    for result, codes in database:
+        board.restore_snapshot(start)
+        for code in codes:
+            move = moves.get(code)
+            if move is None:
+                move = moves[code] = Move.decode(code)
+            board.make_move(move)
+        yield result, board
+
+def import_selfplay(jsonl_path: str, database_path: str) -> int:
+    """
+    Appends the games written by selfplay.py to a database and returns how many were imported.
+    """
+    with GameDatabaseWriter(database_path) as writer:
+        for moves, result in read_selfplay_games(jsonl_path):
+            writer.add_game(moves, result)
+        return writer.num_games
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import games into a compact binary database, or replay the games stored in one.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="append the games of a selfplay.py output file")
+    import_parser.add_argument("source", help="JSONL file written by selfplay.py")
+    import_parser.add_argument("database", help="database file to append to")
+    replay_parser = subparsers.add_parser("replay", help="replay every stored game and report the speed")
+    replay_parser.add_argument("database", help="database file to read")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        num_games = import_selfplay(args.source, args.database)
+        print(f"Imported {num_games} games into {args.database}.")
+    else:
+        start_time = time.perf_counter()
+        num_games = num_plies = 0
+        with GameDatabase(args.database) as database:
+            for _, board in replay_games(database):
+                num_games += 1
+                num_plies += len(board.undo_stack)
+        elapsed = time.perf_counter() - start_time
+        print(f"Replayed {num_games} games ({num_plies} plies) in {elapsed:.2f}s ({num_games / elapsed if elapsed else 0:,.1f} games/s, {num_plies / elapsed if elapsed else 0:,.0f} plies/s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import argparse
+import gc
+import random
+import tracemalloc
+from typing import Callable
+from board import START_FEN, Board
+from game import Game
+from move_generator import generate_legal_moves
+
+def measure_memory(build: Callable[[], object], count: int) -> float:
+    """
+    Keeps count objects made by build alive at once and returns the average number of bytes allocated for each.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    objects = [build() for _ in range(count)]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return size / len(objects)
+
+def play_random_plies(board: Board, plies: int, rng: random.Random) -> Board:
+    for _ in range(plies):
+        moves = generate_legal_moves(board, board.current_turn)
+        if not moves:
+            break
+        board.make_move(rng.choice(moves))
+    return board
+
+def measure_board_memory(num_boards: int, plies: int = 0, seed: int = 0) -> float:
+    """
+    Returns the average number of bytes per board: its squares, pieces, bitboards and the two players holding its piece
+    lists, plus the undo records and key history of the random plies played on it.
+    """
+    rng = random.Random(seed)
+    return measure_memory(lambda: play_random_plies(Board.from_fen(START_FEN), plies, rng), num_boards)
+
+def measure_copy_memory(num_boards: int, plies: int = 0, seed: int = 0) -> float:
+    """
+    Returns the average number of bytes per copy of a board made through its FEN string, which leaves the move history
+    behind.
+    """
+    board = play_random_plies(Board.from_fen(START_FEN), plies, random.Random(seed))
+    fen = board.to_fen()
+    return measure_memory(lambda: Board.from_fen(fen), num_boards)
+
+def measure_game_memory(num_games: int, plies: int = 0, seed: int = 0) -> float:
+    """
+    Returns the average number of bytes per Game: its board and players as for measure_board_memory, plus the Game
+    object and its move list.
+    """
+    rng = random.Random(seed)
+
+    def build() -> Game:
+        game = Game()
+        for _ in range(plies):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.push(rng.choice(moves))
+        return game
+
+    return measure_memory(build, num_games)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how many bytes each live board takes, to estimate how many boards fit in memory.")
+    parser.add_argument("--boards", type=int, default=1000, help="number of boards to keep alive at once")
+    parser.add_argument("--plies", type=int, default=0, help="number of random half moves to play on each board first")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random moves")
+    args = parser.parse_args()
+    for label, measure in (("boards", measure_board_memory), ("board copies", measure_copy_memory), ("games", measure_game_memory)):
+        size = measure(args.boards, args.plies, args.seed)
+        print(f"{args.boards} {label} after {args.plies} plies: {size:,.0f} bytes each ({1024 ** 3 / size:,.0f} per GB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import NamedTuple, Optional
+from bitboard import SQUARE_NAMES
+
+PROMOTION_PIECES = ("queen", "rook", "bishop", "knight")
+PROMOTION_LETTERS = {"queen": "q", "rook": "r", "bishop": "b", "knight": "n"}
+# Promotion codes used in the 16-bit move encoding (0 means no promotion)
+PROMOTION_CODES = {None: 0, "knight": 1, "bishop": 2, "rook": 3, "queen": 4}
+PROMOTION_BY_CODE = {code: piece for piece, code in PROMOTION_CODES.items()}
+PROMOTION_BY_LETTER = {"": None, **{letter: piece for piece, letter in PROMOTION_LETTERS.items()}}
+SQUARE_INDICES = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+class Move(NamedTuple):
+    """
+    A move between two bitboard indices (a1 = 0, h8 = 63). Castling moves use the square of the castling rook as their destination,
+    which is how castling is entered in the terminal game.
+    """
+    src: int
+    dest: int
+    promotion: Optional[str] = None # "queen", "rook", "bishop", "knight" or None
+
+    def __str__(self):
+        return SQUARE_NAMES[self.src] + SQUARE_NAMES[self.dest] + (PROMOTION_LETTERS[self.promotion] if self.promotion else "")
+
+    @property
+    def src_pos(self) -> str:
+        return SQUARE_NAMES[self.src]
+
+    @property
+    def dest_pos(self) -> str:
+        return SQUARE_NAMES[self.dest]
+
+    def encode(self) -> int:
+        """
+        Packs the move into 16 bits: source square in bits 0-5, destination square in bits 6-11 and promotion code in bits 12-14.
+        """
+        return self.src | (self.dest << 6) | (PROMOTION_CODES[self.promotion] << 12)
+
+    @classmethod
+    def decode(cls, code: int) -> Move:
+        return cls(code & 0x3F, (code >> 6) & 0x3F, PROMOTION_BY_CODE[(code >> 12) & 0x7])
+
+    @classmethod
+    def parse(cls, text: str) -> Move:
+        """
+        Reads a move in the notation produced by str(move), such as "e2e4" or "e7e8q". Raises ValueError for anything else.
+        """
+        try:
+            return cls(SQUARE_INDICES[text[0:2]], SQUARE_INDICES[text[2:4]], PROMOTION_BY_LETTER[text[4:]])
+        except KeyError:
+            raise ValueError(f"Invalid move: {text}") from None
+
+class UndoRecord(NamedTuple):
+    """
+    What Board.make_move changed besides the moved piece itself, so that Board.unmake_move can put it back exactly.
+    """
+    move: Move
+    piece: 'Piece'
+    captured_piece: Optional['Piece'] # Captured piece, None for quiet moves and castling
+    captured_index: int # Square the captured piece stood on, which differs from the destination for en passant
+    captured_list_index: int # Position of the captured piece in its player's piece list
+    is_castling: bool
+    had_moved: Optional[bool] # has_moved flag of the moved piece before the move (None for pieces without one)
+    could_be_captured: bool # En passant flag of the moved pawn before the move
+    en_passant_pawn: Optional['Pawn'] # Enemy pawn whose en passant flag expired with the move
+    promoted_piece: Optional['Piece'] # Piece that replaced the pawn on promotion
+    rights_key: int
+    halfmove_clock: int
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from typing import List
+from bitboard import BETWEEN, FULL_BOARD, KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, PIECE_INDICES, RANKS
+from bitboard import get_attackers, get_bishop_attacks, get_rook_attacks, is_square_attacked, iterate_squares
+from move import PROMOTION_PIECES, Move
+
+def get_opponent_color(color: str) -> str:
+    return "black" if color == "white" else "white"
+
+def generate_legal_moves(board: 'Board', color: str) -> List[Move]:
+    """
+    Generates every legal move for one side. Checks and pins are found once from the king's square, so that no candidate
+    move has to be played out on the board to find out whether it leaves the king in check.
+    """
+    bitboards = board.bitboards
+    pieces = bitboards.pieces
+    opponent_color = get_opponent_color(color)
+    base = PIECE_INDICES[(color, "pawn")]
+    opponent_base = PIECE_INDICES[(opponent_color, "pawn")]
+    own = bitboards.occupancy[color]
+    enemy = bitboards.occupancy[opponent_color]
+    occupied = bitboards.occupied
+    empty = FULL_BOARD ^ occupied
+    moves = []
+
+    king = pieces[base + 5]
+    if not king:
+        return moves
+    king_index = king.bit_length() - 1
+
+    for dest in iterate_squares(KING_ATTACKS[king_index] & ~own & ~bitboards.get_king_danger_squares(color)):
+        moves.append(Move(king_index, dest))
+
+    checkers = get_attackers(bitboards, king_index, opponent_color, occupied)
+    if checkers & (checkers - 1):
+        # Only the king can get out of a double check
+        return moves
+    if checkers:
+        check_mask = checkers | BETWEEN[king_index][checkers.bit_length() - 1]
+    else:
+        check_mask = FULL_BOARD
+        moves.extend(generate_castling_moves(board, color, king_index))
+
+    pin_masks = get_pin_masks(bitboards, king_index, base, opponent_base, occupied, own, enemy)
+    targets = ~own & check_mask
+
+    for src in iterate_squares(pieces[base + 1]):
+        if src not in pin_masks:
+            # A pinned knight can never move along its pin ray
+            for dest in iterate_squares(KNIGHT_ATTACKS[src] & targets):
+                moves.append(Move(src, dest))
+    queens = pieces[base + 4]
+    for src in iterate_squares(pieces[base + 2] | queens):
+        for dest in iterate_squares(get_bishop_attacks(src, occupied) & targets & pin_masks.get(src, FULL_BOARD)):
+            moves.append(Move(src, dest))
+    for src in iterate_squares(pieces[base + 3] | queens):
+        for dest in iterate_squares(get_rook_attacks(src, occupied) & targets & pin_masks.get(src, FULL_BOARD)):
+            moves.append(Move(src, dest))
+
+    moves.extend(generate_pawn_moves(board, color, base, opponent_base, king_index, empty, enemy, check_mask, pin_masks))
+    return moves
+
+def get_pin_masks(bitboards, king_index, base, opponent_base, occupied, own, enemy):
+    """
+    Maps the index of every pinned piece to the squares it may still move to: the ray between the king and the pinning piece, including the pinner.
+    """
+    pieces = bitboards.pieces
+    queens = pieces[opponent_base + 4]
+    # Enemy sliders that would attack the king if the friendly pieces were removed
+    snipers = get_rook_attacks(king_index, enemy) & (pieces[opponent_base + 3] | queens)
+    snipers |= get_bishop_attacks(king_index, enemy) & (pieces[opponent_base + 2] | queens)
+    pin_masks = {}
+    for sniper in iterate_squares(snipers):
+        between = BETWEEN[king_index][sniper]
+        blockers = between & occupied
+        if blockers and not blockers & (blockers - 1) and blockers & own:
+            pin_masks[blockers.bit_length() - 1] = between | (1 << sniper)
+    return pin_masks
+
+def generate_castling_moves(board, color, king_index):
+    moves = []
+    king = board.squares[king_index].piece
+    if king.has_moved:
+        return moves
+    bitboards = board.bitboards
+    attacked = bitboards.get_attacked_squares(get_opponent_color(color))
+    occupied = bitboards.occupied
+    rank = king_index // 8
+    for rook_index in iterate_squares(bitboards.get_bitboard(color, "rook") & RANKS[rank]):
+        if abs(rook_index - king_index) < 3 or board.squares[rook_index].piece.has_moved:
+            continue
+        if BETWEEN[king_index][rook_index] & occupied:
+            continue
+        # The king may not pass through or land on an attacked square
+        direction = 1 if rook_index > king_index else -1
+        if attacked >> (king_index + direction) & 1 or attacked >> (king_index + 2 * direction) & 1:
+            continue
+        moves.append(Move(king_index, rook_index))
+    return moves
+
+def get_en_passant_target(board, color):
+    """
+    Returns the square behind an enemy pawn that has just made a double step, or None if no en passant capture is possible.
+    """
+    opponent_color = get_opponent_color(color)
+    # Enemy pawns that have just made a double step stand on the fifth rank from this side's point of view
+    rank, step = (4, 8) if color == "white" else (3, -8)
+    for index in iterate_squares(board.bitboards.get_bitboard(opponent_color, "pawn") & RANKS[rank]):
+        if board.squares[index].piece.en_passant_capture.can_be_captured:
+            return index + step
+    return None
+
+def generate_pawn_moves(board, color, base, opponent_base, king_index, empty, enemy, check_mask, pin_masks):
+    moves = []
+    bitboards = board.bitboards
+    pawns = bitboards.pieces[base]
+    if not pawns:
+        return moves
+    step, start_rank, final_rank = (8, 1, 7) if color == "white" else (-8, 6, 0)
+    attacks = PAWN_ATTACKS[color]
+    for src in iterate_squares(pawns):
+        allowed = check_mask & pin_masks.get(src, FULL_BOARD)
+        dest = src + step
+        if empty >> dest & 1:
+            if allowed >> dest & 1:
+                append_pawn_move(moves, src, dest, final_rank)
+            double_dest = dest + step
+            if src // 8 == start_rank and empty >> double_dest & 1 and allowed >> double_dest & 1:
+                moves.append(Move(src, double_dest))
+        for dest in iterate_squares(attacks[src] & enemy & allowed):
+            append_pawn_move(moves, src, dest, final_rank)
+
+    en_passant_target = get_en_passant_target(board, color)
+    if en_passant_target is not None:
+        opponent_color = get_opponent_color(color)
+        captured = en_passant_target - step
+        for src in iterate_squares(PAWN_ATTACKS[opponent_color][en_passant_target] & pawns):
+            # En passant removes two pieces from the same rank, so its legality is tested by replaying it on the occupancy mask
+            occupied = (bitboards.occupied ^ (1 << src) ^ (1 << captured)) | (1 << en_passant_target)
+            if not is_square_attacked(bitboards, king_index, opponent_color, occupied):
+                moves.append(Move(src, en_passant_target))
+    return moves
+
+def append_pawn_move(moves, src, dest, final_rank):
+    if dest // 8 == final_rank:
+        for promotion in PROMOTION_PIECES:
+            moves.append(Move(src, dest, promotion))
+    else:
+        moves.append(Move(src, dest))
+
+def is_in_check(board: 'Board', color: str) -> bool:
+    return bool(board.bitboards.get_bitboard(color, "king") & board.bitboards.get_attacked_squares(get_opponent_color(color)))
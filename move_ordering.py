@@ -0,0 +1,78 @@
+from __future__ import annotations
+from typing import List, Optional
+from bitboard import NUM_SQUARES, PIECE_TYPES
+from move import Move
+
+MAX_PLY = 128
+KILLERS_PER_PLY = 2
+# Sort keys, highest first: the transposition table move, then winning material, then killers, then quiet moves by history
+TT_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORE = 1 << 27
+MAX_HISTORY = KILLER_SCORE - 1
+# Rank of each piece type as a victim or attacker, pawn = 0 up to king = 5
+PIECE_RANKS = {piece_type: rank for rank, piece_type in enumerate(PIECE_TYPES)}
+
+class MoveOrderer:
+    """
+    Orders moves for alpha-beta search so that the moves most likely to cause a cutoff are searched first.
+
+    Captures and queen promotions come first, most valuable victim first and least valuable attacker first among equal
+    victims. Then come the killer moves of the ply, quiet moves that caused a cutoff in a sibling node, and then the
+    other quiet moves by how often they caused cutoffs anywhere in the search (the history table).
+    """
+    def __init__(self) -> None:
+        self.killers: List[List[Optional[Move]]] = [[None] * KILLERS_PER_PLY for _ in range(MAX_PLY)]
+        self.history = {"white": [0] * (NUM_SQUARES * NUM_SQUARES), "black": [0] * (NUM_SQUARES * NUM_SQUARES)}
+
+    def order_moves(self, board: 'Board', moves: List[Move], tt_move: Optional[Move] = None, ply: int = 0) -> None:
+        squares = board.squares
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        history = self.history[board.current_turn]
+
+        def get_score(move: Move) -> int:
+            if move == tt_move:
+                return TT_MOVE_SCORE
+            attacker = squares[move.src].piece
+            victim = squares[move.dest].piece
+            if victim is not None and victim.color == attacker.color:
+                # Castling, entered as the king moving onto its own rook
+                victim = None
+            if victim is not None or move.promotion == "queen":
+                victim_rank = PIECE_RANKS[victim.type] if victim is not None else 0
+                promotion_rank = PIECE_RANKS["queen"] if move.promotion == "queen" else 0
+                return CAPTURE_SCORE + (victim_rank + promotion_rank) * 8 + len(PIECE_RANKS) - PIECE_RANKS[attacker.type]
+            if attacker.type == "pawn" and (move.src - move.dest) % 8:
+                # En passant: a pawn moving diagonally onto an empty square takes a pawn
+                return CAPTURE_SCORE + len(PIECE_RANKS) - PIECE_RANKS["pawn"]
+            if move in killers:
+                return KILLER_SCORE + KILLERS_PER_PLY - killers.index(move)
+            return history[move.src * NUM_SQUARES + move.dest]
+
+        moves.sort(key=get_score, reverse=True)
+
+    def is_quiet(self, board: 'Board', move: Move) -> bool:
+        attacker = board.squares[move.src].piece
+        victim = board.squares[move.dest].piece
+        if move.promotion is not None or (victim is not None and victim.color != attacker.color):
+            return False
+        return not (attacker.type == "pawn" and (move.src - move.dest) % 8)
+
+    def record_cutoff(self, board: 'Board', move: Move, ply: int, depth: int) -> None:
+        """
+        Remembers a quiet move that failed high, as a killer for its ply and in the history table of the side to move.
+        """
+        if not self.is_quiet(board, move):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1:] = killers[:-1]
+                killers[0] = move
+        history = self.history[board.current_turn]
+        index = move.src * NUM_SQUARES + move.dest
+        history[index] += depth * depth
+        if history[index] > MAX_HISTORY:
+            # Halve every entry so that the history keeps its order but stays below the killers
+            for color_history in self.history.values():
+                color_history[:] = [value // 2 for value in color_history]
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import random
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from board import START_FEN, Board
+from move import Move
+from move_generator import generate_legal_moves
+
+# Every entry is a position's Zobrist key, a move (Move.encode()) and its weight. Entries are sorted by key, so all moves
+# of a position are adjacent and can be found by binary search.
+ENTRY = struct.Struct("<QHH")
+MAX_WEIGHT = 0xFFFF
+BOOK_PLIES = 20 # Only the first moves of each game go into the book
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+class OpeningBook:
+    """
+    Read-only opening book file, mapped into memory and probed by binary search on the position's Zobrist key.
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as book_file:
+            size = os.fstat(book_file.fileno()).st_size
+            if size % ENTRY.size:
+                raise ValueError(f"Not an opening book: {path}")
+            # An empty file cannot be mapped, and simply has no entries
+            self.map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.num_entries = len(self.map) // ENTRY.size
+
+    def __len__(self) -> int:
+        return self.num_entries
+
+    def close(self) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+    def get_key(self, entry_index: int) -> int:
+        return ENTRY.unpack_from(self.map, entry_index * ENTRY.size)[0]
+
+    def probe(self, key: int) -> List[Tuple[Move, int]]:
+        """
+        Returns the book moves for a position with their weights.
+        """
+        low, high = 0, self.num_entries
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        for entry_index in range(low, self.num_entries):
+            entry_key, code, weight = ENTRY.unpack_from(self.map, entry_index * ENTRY.size)
+            if entry_key != key:
+                break
+            moves.append((Move.decode(code), weight))
+        return moves
+
+    def choose_move(self, board: Board, rng: random.Random = random) -> Optional[Move]:
+        """
+        Picks one of the book moves for the side to move at random, in proportion to their weights, or returns None when
+        the position is not in the book. Moves that are not legal in the position (a hash collision) are never played.
+        """
+        candidates = self.probe(board.zobrist_key)
+        if not candidates:
+            return None
+        legal_moves = set(generate_legal_moves(board, board.current_turn))
+        candidates = [(move, weight) for move, weight in candidates if move in legal_moves]
+        if not candidates:
+            return None
+        moves, weights = zip(*candidates)
+        return rng.choices(moves, weights)[0]
+
+def load_default_book() -> Optional[OpeningBook]:
+    """
+    Opens the opening book shipped next to the engine, or returns None if it has not been built.
+    """
+    return OpeningBook(DEFAULT_BOOK_PATH) if os.path.exists(DEFAULT_BOOK_PATH) else None
+
+def get_game_weight(result: Optional[str], color: str) -> int:
+    # Moves played by the winner count double, moves played by the loser are left out
+    if result in ("white", "black"):
+        return 2 if result == color else 0
+    return 1
+
+def build_book(games: Iterable[Tuple[Iterable[Move], Optional[str]]], path: str, book_plies: int = BOOK_PLIES, min_weight: int = 1) -> int:
+    """
+    Replays games, given as (moves, result) pairs from the starting position, and writes the moves played in their first
+    book_plies positions to a book file. Returns the number of entries written.
+    """
+    weights: Dict[Tuple[int, int], int] = {}
+    board = Board.from_fen(START_FEN)
+    for moves, result in games:
+        board.set_fen(START_FEN)
+        for ply, move in enumerate(moves):
+            if ply >= book_plies:
+                break
+            if weight := get_game_weight(result, board.current_turn):
+                entry = (board.zobrist_key, move.encode())
+                weights[entry] = weights.get(entry, 0) + weight
+            board.make_move(move)
+    entries = sorted((key, code, weight) for (key, code), weight in weights.items() if weight >= min_weight)
+    # Weights are scaled down together when the most common move would not fit in 16 bits
+    scale = max((weight for _, _, weight in entries), default=0) / MAX_WEIGHT
+    with open(path, "wb") as book_file:
+        for key, code, weight in entries:
+            book_file.write(ENTRY.pack(key, code, max(1, int(weight / scale)) if scale > 1 else weight))
+    return len(entries)
+
+def read_source_games(path: str, book_plies: int = BOOK_PLIES) -> Iterator[Tuple[List[Move], Optional[str]]]:
+    """
+    Reads games from a PGN file (.pgn), a selfplay.py output file (.jsonl) or a binary game database (anything else).
+    Only the first book_plies moves of PGN games are parsed. Games that do not start from the starting position or contain an illegal move are skipped.
+    """
+    if path.endswith(".pgn"):
+        from pgn import parse_san, read_games
+        pgn_results = {"1-0": "white", "0-1": "black", "1/2-1/2": "draw"}
+        board = Board.from_fen(START_FEN)
+        with open(path, encoding="utf-8", errors="replace") as pgn_file:
+            for game in read_games(pgn_file):
+                if game.headers.get("FEN", START_FEN) != START_FEN:
+                    continue
+                board.set_fen(START_FEN)
+                moves = []
+                try:
+                    for san in game.moves[:book_plies]:
+                        moves.append(parse_san(board, san))
+                        board.make_move(moves[-1])
+                except ValueError:
+                    continue
+                yield moves, pgn_results.get(game.result)
+    elif path.endswith(".jsonl"):
+        from selfplay import read_selfplay_games
+        yield from read_selfplay_games(path)
+    else:
+        from game_database import GameDatabase
+        with GameDatabase(path) as database:
+            for result, codes in database:
+                yield [Move.decode(code) for code in codes], result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book from game collections, or look up a position in one.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="build a book from PGN files, selfplay.py output or game databases")
+    build_parser.add_argument("sources", nargs="+", help="game files to read")
+    build_parser.add_argument("--output", default=DEFAULT_BOOK_PATH, help="book file to write")
+    build_parser.add_argument("--plies", type=int, default=BOOK_PLIES, help="number of opening half moves to take from each game")
+    build_parser.add_argument("--min-weight", type=int, default=1, help="leave out moves with a smaller total weight")
+    probe_parser = subparsers.add_parser("probe", help="list the book moves for a position")
+    probe_parser.add_argument("fen", nargs="?", default=START_FEN, help="position to look up")
+    probe_parser.add_argument("--book", default=DEFAULT_BOOK_PATH, help="book file to read")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        games = (game for source in args.sources for game in read_source_games(source, args.plies))
+        num_entries = build_book(games, args.output, args.plies, args.min_weight)
+        print(f"Wrote {num_entries} book entries to {args.output}.")
+    else:
+        book = OpeningBook(args.book)
+        for move, weight in sorted(book.probe(Board.from_fen(args.fen).zobrist_key), key=lambda candidate: -candidate[1]):
+            print(f"{move}: {weight}")
+        book.close()
+
+if __name__ == "__main__":
+    main()
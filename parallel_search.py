@@ -0,0 +1,118 @@
+from __future__ import annotations
+import argparse
+import multiprocessing
+import os
+import time
+from typing import List, Optional, Tuple
+from board import START_FEN, Board
+from move import Move
+from search import Search, SearchLimits
+from transposition_table import SharedTranspositionTable
+
+TRANSPOSITION_TABLE_MB = 64
+# Processes used when the caller does not say. Kept small, because the speedup from more processes has not been measured
+# on a machine with more cores (on one core every extra process only adds overhead)
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+
+# Each helper process attaches to the shared table once and keeps it for every search
+helper_transposition_table = None
+helper_stop_event = None
+
+def initialize_helper(transposition_table_name: str, stop_event) -> None:
+    global helper_transposition_table, helper_stop_event
+    helper_transposition_table = SharedTranspositionTable(name=transposition_table_name)
+    helper_stop_event = stop_event
+
+def run_helper(fen: str, key_history: List[int], limits: SearchLimits, helper_number: int) -> Tuple[int, int, Optional[int], int]:
+    """
+    Searches the root position in a helper process and returns the deepest completed iteration, its score, its best
+    move (encoded) and the number of nodes searched. The keys of the positions played before the root let the helper
+    see repetitions of the game.
+    """
+    board = Board.from_fen(fen)
+    board.key_history = key_history
+    # Half of the helpers start one iteration deeper, so that the processes spread over different depths instead of
+    # all searching the same tree in lockstep
+    search = Search(board, helper_transposition_table, limits, helper_stop_event, start_depth=1 + helper_number % 2)
+    best_move = search.find_best_move()
+    # The first process to finish its search ends it for everybody
+    helper_stop_event.set()
+    return search.depth, search.score, best_move.encode() if best_move else None, search.nodes
+
+class ParallelSearch:
+    """
+    Lazy SMP: several processes search the same root position at once, sharing nothing but a transposition table in
+    shared memory. Each process runs an ordinary iterative-deepening search, and the entries the others store let it
+    skip subtrees they have already searched. The calling process searches too, and the move from the deepest completed
+    iteration of any process is played.
+
+    The helper processes are started once and reused for every search, until close() is called.
+    """
+    def __init__(self, num_workers: int = DEFAULT_WORKERS, transposition_table_mb: float = TRANSPOSITION_TABLE_MB) -> None:
+        self.num_workers = max(1, num_workers)
+        self.transposition_table = SharedTranspositionTable(transposition_table_mb)
+        self.stop_event = multiprocessing.Event()
+        self.pool = None
+        if self.num_workers > 1:
+            self.pool = multiprocessing.Pool(self.num_workers - 1, initializer=initialize_helper, initargs=(self.transposition_table.name, self.stop_event))
+        self.nodes = 0 # Nodes searched by all processes in the last search
+        self.depth = 0
+        self.score = 0
+
+    def __enter__(self) -> ParallelSearch:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.transposition_table.close()
+
+    def find_best_move(self, board: Board, limits: SearchLimits = SearchLimits()) -> Optional[Move]:
+        self.stop_event.clear()
+        fen = board.to_fen()
+        helper_results = [self.pool.apply_async(run_helper, (fen, board.key_history, limits, helper_number)) for helper_number in range(1, self.num_workers)] if self.pool else []
+        # Only this search ages the shared entries, since the helpers do not own the table
+        search = Search(board, self.transposition_table, limits, self.stop_event)
+        best_move = search.find_best_move()
+        self.stop_event.set()
+        self.depth, self.score, self.nodes = search.depth, search.score, search.nodes
+        for helper_result in helper_results:
+            depth, score, best_move_code, nodes = helper_result.get()
+            self.nodes += nodes
+            # Ties go to the calling process, whose search started first
+            if depth > self.depth and best_move_code is not None:
+                self.depth, self.score, best_move = depth, score, Move.decode(best_move_code)
+        return best_move
+
+def measure_time_to_depth(fen: str, depth: int, worker_counts, transposition_table_mb: float = TRANSPOSITION_TABLE_MB) -> None:
+    """
+    Prints how long each number of processes takes to complete a search to the given depth, and the speedup over one.
+    """
+    board = Board.from_fen(fen)
+    single_time = None
+    for num_workers in worker_counts:
+        with ParallelSearch(num_workers, transposition_table_mb) as parallel_search:
+            start_time = time.perf_counter()
+            best_move = parallel_search.find_best_move(board, SearchLimits(max_depth=depth))
+            elapsed = time.perf_counter() - start_time
+        if num_workers == 1:
+            single_time = elapsed
+        speedup = f", {single_time / elapsed:.2f}x" if single_time else ""
+        print(f"{num_workers} workers: depth {parallel_search.depth} in {elapsed:.2f}s ({parallel_search.nodes:,} nodes{speedup}), best move {best_move}, score {parallel_search.score}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the time to depth of the parallel search for different numbers of processes.")
+    parser.add_argument("--fen", default=START_FEN, help="position to search")
+    parser.add_argument("--depth", type=int, default=4, help="depth to search to")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of processes to compare")
+    parser.add_argument("--hash", type=float, default=TRANSPOSITION_TABLE_MB, help="shared transposition table size in MB")
+    args = parser.parse_args()
+    measure_time_to_depth(args.fen, args.depth, args.workers, args.hash)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import argparse
+import time
+from typing import Dict, Tuple
+from board import START_FEN, Board
+from move_generator import generate_legal_moves, get_opponent_color
+
+# Standard perft test positions with their known node counts by depth
+POSITIONS = {
+    "start": (None, [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -", [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -", [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq -", [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ -", [44, 1486, 62379, 2103487]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - -", [46, 2079, 89890, 3894594]),
+}
+
+def set_up_position(fen: str = None, perspective: str = "white") -> Tuple[Board, str]:
+    """
+    Builds a board for a perft position and returns it with the color to move. Without a FEN string the starting position is used.
+    """
+    board = Board.from_fen(fen or START_FEN, perspective)
+    return board, board.current_turn
+
+def perft(board: Board, color: str, depth: int) -> int:
+    moves = generate_legal_moves(board, color)
+    # Leaf moves only need to be counted, not played
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    opponent_color = get_opponent_color(color)
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, opponent_color, depth - 1)
+        board.unmake_move()
+    return nodes
+
+def divide(board: Board, color: str, depth: int) -> Dict[str, int]:
+    results = {}
+    opponent_color = get_opponent_color(color)
+    for move in generate_legal_moves(board, color):
+        board.make_move(move)
+        results[str(move)] = perft(board, opponent_color, depth - 1)
+        board.unmake_move()
+    return results
+
+def run_perft(name: str, depth: int, show_divide: bool = False, perspective: str = "white") -> bool:
+    fen, expected_counts = POSITIONS[name]
+    board, color = set_up_position(fen, perspective)
+    start_time = time.perf_counter()
+    if show_divide:
+        results = divide(board, color, depth)
+        for move, count in results.items():
+            print(f"{move}: {count}")
+        nodes = sum(results.values())
+    else:
+        nodes = perft(board, color, depth)
+    elapsed = time.perf_counter() - start_time
+    expected = expected_counts[depth - 1] if depth <= len(expected_counts) else None
+    status = "" if expected is None else (" OK" if nodes == expected else f" MISMATCH (expected {expected})")
+    print(f"{name} depth {depth}: {nodes} nodes in {elapsed:.3f}s ({nodes / elapsed if elapsed else 0:,.0f} nodes/s){status}")
+    return expected is None or nodes == expected
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count leaf nodes of the legal move tree to measure move generation speed and correctness.")
+    parser.add_argument("depth", type=int, help="search depth in plies")
+    parser.add_argument("--position", choices=list(POSITIONS) + ["all"], default="start", help="test position to start from")
+    parser.add_argument("--divide", action="store_true", help="print the node count below each root move")
+    parser.add_argument("--perspective", choices=["white", "black"], default="white", help="board orientation, to cover both coordinate mappings")
+    args = parser.parse_args()
+    names = list(POSITIONS) if args.position == "all" else [args.position]
+    results = [run_perft(name, args.depth, args.divide, args.perspective) for name in names]
+    if not all(results):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import argparse
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+from board import START_FEN, Board
+from move import Move
+from move_generator import generate_legal_moves
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Comment and variation delimiters are tokens of their own, everything else is split on whitespace
+TOKEN_PATTERN = re.compile(r"[{}();]|[^\s{}();]+")
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+\.+")
+SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+SAN_PIECE_TYPES = {None: "pawn", "N": "knight", "B": "bishop", "R": "rook", "Q": "queen", "K": "king"}
+SAN_PROMOTIONS = {None: None, "N": "knight", "B": "bishop", "R": "rook", "Q": "queen"}
+
+class PgnGame(NamedTuple):
+    headers: Dict[str, str]
+    moves: List[str] # Moves in standard algebraic notation, without move numbers, comments or variations
+    result: str
+
+class IllegalMove(NamedTuple):
+    ply: int # Counted from 1, or 0 when the game's FEN tag could not be set up
+    san: str
+    reason: str
+
+def read_games(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """
+    Yields the games of a PGN stream one at a time. Only the game being read is held in memory, so files of any size can
+    be streamed line by line.
+    """
+    headers = {}
+    moves = []
+    in_comment = False
+    variation_depth = 0
+    for line in lines:
+        if not in_comment and variation_depth == 0:
+            stripped = line.strip()
+            if stripped.startswith("["):
+                if moves:
+                    # The previous game ended without a result token
+                    yield PgnGame(headers, moves, headers.get("Result", "*"))
+                    headers, moves = {}, []
+                if match := TAG_PATTERN.match(stripped):
+                    headers[match.group(1)] = match.group(2).replace('\\"', '"').replace("\\\\", "\\")
+                continue
+            if stripped.startswith("%"):
+                continue
+        for token in TOKEN_PATTERN.findall(line):
+            if in_comment:
+                in_comment = token != "}"
+            elif token == "{":
+                in_comment = True
+            elif token == ";":
+                # The rest of the line is a comment
+                break
+            elif token == "(":
+                variation_depth += 1
+            elif token == ")":
+                variation_depth = max(0, variation_depth - 1)
+            elif variation_depth:
+                continue
+            elif token in RESULTS:
+                yield PgnGame(headers, moves, token)
+                headers, moves = {}, []
+            elif not token.startswith("$"):
+                # Move numbers may be written against the move ("1.e4")
+                if san := MOVE_NUMBER_PATTERN.sub("", token):
+                    moves.append(san)
+    if moves or headers:
+        yield PgnGame(headers, moves, headers.get("Result", "*"))
+
+def parse_san(board: Board, san: str) -> Move:
+    """
+    Finds the legal move for the side to move that a move in standard algebraic notation stands for. Raises ValueError
+    if no legal move or more than one legal move matches.
+    """
+    text = san.rstrip("+#!?")
+    legal_moves = generate_legal_moves(board, board.current_turn)
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        kingside = len(text) == 3
+        for move in legal_moves:
+            if is_castling_move(board, move) and (move.dest > move.src) == kingside:
+                return move
+        raise ValueError(f"Castling is not legal: {san}")
+
+    match = SAN_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Unreadable move: {san}")
+    piece_letter, src_file, src_rank, dest_pos, promotion_letter = match.groups()
+    piece_type = SAN_PIECE_TYPES[piece_letter]
+    dest = board.get_index_from_pos(dest_pos)
+    promotion = SAN_PROMOTIONS[promotion_letter]
+    candidates = []
+    for move in legal_moves:
+        if move.dest != dest or move.promotion != promotion:
+            continue
+        src_pos = move.src_pos
+        if (src_file and src_pos[0] != src_file) or (src_rank and src_pos[1] != src_rank):
+            continue
+        if board.get_piece_at(move.src).type == piece_type and not is_castling_move(board, move):
+            candidates.append(move)
+    if len(candidates) != 1:
+        raise ValueError(f"{'Ambiguous' if candidates else 'Illegal'} move: {san}")
+    return candidates[0]
+
+def is_castling_move(board: Board, move: Move) -> bool:
+    # Castling moves are encoded as the king moving onto its own rook
+    target = board.get_piece_at(move.dest)
+    return target is not None and target.color == board.current_turn
+
+def replay_game(board: Board, game: PgnGame) -> Optional[IllegalMove]:
+    """
+    Sets the board up from the game's FEN tag (or the starting position) and plays its moves through the legal move
+    generator. Returns the first illegal move (or a bad FEN tag, as ply 0), or None if every move was legal.
+    """
+    try:
+        board.set_fen(game.headers.get("FEN", START_FEN))
+    except ValueError as error:
+        return IllegalMove(0, "", str(error))
+    for ply, san in enumerate(game.moves, start=1):
+        try:
+            move = parse_san(board, san)
+        except ValueError as error:
+            return IllegalMove(ply, san, str(error))
+        board.make_move(move)
+    return None
+
+def validate_file(path: str, max_games: Optional[int] = None, verbose: bool = True) -> int:
+    """
+    Replays every game in a PGN file, printing each illegal move with its game and ply, and returns the number of games
+    that contained one.
+    """
+    board = Board.from_fen(START_FEN)
+    num_games = num_plies = num_invalid = 0
+    start_time = time.perf_counter()
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        for game_number, game in enumerate(read_games(pgn_file), start=1):
+            if max_games is not None and game_number > max_games:
+                break
+            num_games += 1
+            illegal_move = replay_game(board, game)
+            if illegal_move is None:
+                num_plies += len(game.moves)
+            else:
+                num_plies += max(0, illegal_move.ply - 1)
+                num_invalid += 1
+                if verbose:
+                    players = f"{game.headers.get('White', '?')} - {game.headers.get('Black', '?')}"
+                    print(f"Game {game_number} ({players}), ply {illegal_move.ply}: {illegal_move.reason}")
+    elapsed = time.perf_counter() - start_time
+    print(f"Replayed {num_games} games ({num_plies} plies) in {elapsed:.2f}s ({num_games / elapsed if elapsed else 0:,.1f} games/s, {num_plies / elapsed if elapsed else 0:,.0f} plies/s). {num_invalid} games with illegal moves.")
+    return num_invalid
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a PGN file and check every game's moves against the engine's rules.")
+    parser.add_argument("path", help="PGN file to read")
+    parser.add_argument("--max-games", type=int, default=None, help="stop after this many games")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary, not every illegal move")
+    args = parser.parse_args()
+    if validate_file(args.path, args.max_games, not args.quiet):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
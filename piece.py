@@ -2,30 +2,79 @@ from __future__ import annotations
 from dataclasses import dataclass
 from chess_attributes import ChessAttributes
 
+BOARD_SIZE = 8
+KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+LINEAR_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+def build_offset_table(offsets):
+    """
+    Precomputes, for every (row, col) on the board, the in-bounds squares reachable with the given offsets.
+    """
+    return [[[(row + row_offset, col + col_offset) for row_offset, col_offset in offsets if 0 <= row + row_offset < BOARD_SIZE and 0 <= col + col_offset < BOARD_SIZE] for col in range(BOARD_SIZE)] for row in range(BOARD_SIZE)]
+
+KNIGHT_MOVES = build_offset_table(KNIGHT_OFFSETS)
+KING_MOVES = build_offset_table(KING_OFFSETS)
+
 class Piece(ChessAttributes):
+    # Data shared by all pieces of a type lives on the class, so each piece only stores its own state
+    __slots__ = ("color", "perspective", "coordinates", "index", "position", "pieces")
+    type = None
+    CHARACTERS = {}
+
     def __init__(self, color, perspective, coordinates, pieces):
-        super().__init__()
         self.color = color
         self.perspective = perspective
-        self.coordinates = coordinates
-        self.position = self.get_pos_from_coords(coordinates, self.perspective)
+        self.set_coordinates(coordinates)
         self.pieces = pieces
 
+    def set_coordinates(self, coordinates):
+        """
+        Places the piece on a grid square, keeping its bitboard index and algebraic position in step with its coordinates.
+        """
+        self.index = self.get_index_from_coords(coordinates, self.perspective)
+        # The shared coordinate tuple from the lookup table, rather than the caller's copy
+        self.coordinates = self.get_coords_from_index(self.index, self.perspective)
+        self.position = self.get_pos_from_index(self.index)
+
+    @property
+    def character(self):
+        return self.CHARACTERS[self.color]
+
     def move_piece(self, board, row_src, col_src, row_dest, col_dest):
         source_square = self.get_square(board, row_src, col_src)
         dest_square = self.get_square(board, row_dest, col_dest)
         dest_square.piece = source_square.piece
         source_square.piece = None
-        self.coordinates = (row_dest, col_dest)
-        self.position = self.get_pos_from_coords(self.coordinates, self.perspective)
+        self.set_coordinates((row_dest, col_dest))
 
     def list_valid_moves(self, board, row_src, col_src):
         valid_moves = []
+        for row_dest, col_dest in self.generate_candidate_moves(board, row_src, col_src):
+            if self.is_valid_move(board, row_src, col_src, row_dest, col_dest):
+                valid_moves.append((row_dest, col_dest))
+        # Sorted so that the moves come out in the same row/col order as a full board scan
+        return sorted(valid_moves)
+
+    def generate_candidate_moves(self, board, row_src, col_src):
+        """
+        Yields every square that the piece could possibly move to. Subclasses narrow this down to the squares reachable by their movement pattern.
+        """
         for row_dest in range(self.BOARD_SIZE):
             for col_dest in range(self.BOARD_SIZE):
-                if self.is_valid_move(board, row_src, col_src, row_dest, col_dest):
-                    valid_moves.append((row_dest, col_dest))
-        return valid_moves
+                yield row_dest, col_dest
+
+    def generate_ray_moves(self, board, row_src, col_src, directions):
+        for row_step, col_step in directions:
+            row_dest, col_dest = row_src + row_step, col_src + col_step
+            while 0 <= row_dest < self.BOARD_SIZE and 0 <= col_dest < self.BOARD_SIZE:
+                yield row_dest, col_dest
+                # The first occupied square ends the ray, whether it holds a capturable piece or not
+                if board[row_dest][col_dest].piece is not None:
+                    break
+                row_dest += row_step
+                col_dest += col_step
 
     def get_move_coordinates(self, position):
         row_src, col_src = self.coordinates
@@ -33,28 +82,6 @@ class Piece(ChessAttributes):
         row_dest, col_dest = dest_coords
         return row_src, col_src, row_dest, col_dest
 
-    def test_move_piece(self, board, row_dest, col_dest):
-        row_src, col_src = self.coordinates
-        print(f"Source square: {row_src}, {col_src}")
-        source_square = self.get_square(board, row_src, col_src)
-        print(f"Destination square: {row_dest}, {col_dest}")
-        dest_square = self.get_square(board, row_dest, col_dest)
-        captured_piece = dest_square.piece
-        dest_square.piece = source_square.piece
-        source_square.piece = None
-        self.coordinates = (row_dest, col_dest)
-        self.position = self.get_pos_from_coords(self.coordinates, self.perspective)
-        return captured_piece
-
-    def reset_move(self, board, row_dest, col_dest, captured_piece):
-        row_src, col_src = self.coordinates
-        source_square = self.get_square(board, row_src, col_src)
-        dest_square = self.get_square(board, row_dest, col_dest)
-        dest_square.piece = source_square.piece
-        source_square.piece = captured_piece
-        self.coordinates = (row_dest, col_dest)
-        self.position = self.get_pos_from_coords(self.coordinates, self.perspective)
-
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         return self.is_within_bounds(row_dest, col_dest) and (not self.is_occupied_square(board, row_dest, col_dest) or self.is_capturable_piece(board, row_src, col_src, row_dest, col_dest))
 
@@ -85,10 +112,12 @@ class Piece(ChessAttributes):
                 return not piece.is_in_check(board)
     
 class King(Piece):
+    __slots__ = ("opponent_pieces", "has_moved")
+    type = "king"
+    CHARACTERS = {"white": "♔", "black": "♚"}
+
     def __init__(self, color, perspective, coordinates, pieces, opponent_pieces):
         super().__init__(color, perspective, coordinates, pieces)
-        self.type = "king"
-        self.character = "♔" if self.color == "white" else "♚"
         self.opponent_pieces = opponent_pieces
         self.has_moved = False
 
@@ -115,8 +144,7 @@ class King(Piece):
         dest_square = self.get_square(board, row_dest, col_dest)
         dest_square.piece = source_square.piece
         source_square.piece = None
-        self.coordinates = (row_dest, col_dest)
-        self.position = self.get_pos_from_coords(self.coordinates, self.perspective)
+        self.set_coordinates((row_dest, col_dest))
 
     def perform_castling_move(self, board, row_src, col_src, row_dest, col_dest):
         castling_direction = self.get_castling_direction(col_src, col_dest)
@@ -128,8 +156,7 @@ class King(Piece):
         king_dest_square = self.get_square(board, row_dest, king_col_dest)
         king_dest_square.piece = king_source_square.piece
         king_source_square.piece = None
-        self.coordinates = (row_dest, king_col_dest)
-        self.position = self.get_pos_from_coords(self.coordinates, self.perspective)
+        self.set_coordinates((row_dest, king_col_dest))
 
         # Move rook
         rook_source_square = self.get_square(board, row_src, col_dest)
@@ -137,14 +164,16 @@ class King(Piece):
         rook_dest_square = self.get_square(board, row_dest, rook_col_dest)
         rook_dest_square.piece = rook_source_square.piece
         rook_source_square.piece = None
-        rook_coords = (row_dest, rook_col_dest)
-        rook_dest_square.piece.coordinates = rook_coords
-        rook_dest_square.piece.position = self.get_pos_from_coords(rook_coords, self.perspective)
+        rook_dest_square.piece.set_coordinates((row_dest, rook_col_dest))
+
+    def generate_candidate_moves(self, board, row_src, col_src):
+        yield from KING_MOVES[row_src][col_src]
+        # Castling moves are entered as the destination of the friendly rook
+        for col_dest in range(self.BOARD_SIZE):
+            if abs(col_dest - col_src) > 1 and self.is_friendly_rook(board, row_src, col_src, row_src, col_dest):
+                yield row_src, col_dest
 
     def can_attack_position(self, board, row_src, col_src, row_dest, col_dest):
-        """
-        This function exists specifically to check whether the opponent king can attack the square that the friendly king is intending to move to.
-        """
         return self.is_valid_single_space_move(board, row_src, col_src, row_dest, col_dest)
     
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
@@ -167,7 +196,6 @@ class King(Piece):
         return not board[row][col].piece.has_moved
     
     def has_not_moved_king(self):
-        print(f"King hasn't moved: {not self.has_moved}")
         return not self.has_moved
                 
     def is_clear_path(self, board, row_src, col_src, col_dest):
@@ -195,26 +223,18 @@ class King(Piece):
         return (col_dest - col_src) // dist_x
     
     def is_safe_square(self, board, row_src, col_src, row_dest, col_dest):
-        captured_piece = self.test_move_piece(board, row_dest, col_dest)
-        if self.is_in_check(board):
-            self.reset_move(board, row_src, col_src, captured_piece)
-            return False
-        self.reset_move(board, row_src, col_src, captured_piece)
-        return True
+        dest_square = self.get_square(board, row_dest, col_dest)
+        return not dest_square.chess_board.bitboards.get_king_danger_squares(self.color) >> dest_square.index & 1
     
     def is_in_check(self, board):
         row, col = self.coordinates
-        for piece in self.opponent_pieces:
-            opponent_row, opponent_col = piece.coordinates
-            if piece.can_attack_position(board, opponent_row, opponent_col, row, col):
-                return True
-        return False
+        square = self.get_square(board, row, col)
+        return square.chess_board.is_square_attacked(square.index, "black" if self.color == "white" else "white")
 
 class Queen(Piece):
-    def __init__(self, color, perspective, coordinates, pieces):
-        super().__init__(color, perspective, coordinates, pieces)
-        self.type = "queen"
-        self.character = "♕" if self.color == "white" else "♛"
+    __slots__ = ()
+    type = "queen"
+    CHARACTERS = {"white": "♕", "black": "♛"}
 
     def __repr__(self):
         return "queen"
@@ -227,6 +247,9 @@ class Queen(Piece):
         else:
             return False
     
+    def generate_candidate_moves(self, board, row_src, col_src):
+        return self.generate_ray_moves(board, row_src, col_src, LINEAR_DIRECTIONS + DIAGONAL_DIRECTIONS)
+
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         if super().is_valid_move(board, row_src, col_src, row_dest, col_dest):
             if self.is_linear_move(row_src, col_src, row_dest, col_dest) or self.is_diagonal_move(row_src, col_src, row_dest, col_dest):
@@ -279,10 +302,9 @@ class Queen(Piece):
         return True
     
 class Bishop(Piece):
-    def __init__(self, color, perspective, coordinates, pieces):
-        super().__init__(color, perspective, coordinates, pieces)
-        self.type = "bishop"
-        self.character = "♗" if self.color == "white" else "♝"
+    __slots__ = ()
+    type = "bishop"
+    CHARACTERS = {"white": "♗", "black": "♝"}
 
     def __repr__(self):
         return "bishop"
@@ -295,6 +317,9 @@ class Bishop(Piece):
         else:
             return False
     
+    def generate_candidate_moves(self, board, row_src, col_src):
+        return self.generate_ray_moves(board, row_src, col_src, DIAGONAL_DIRECTIONS)
+
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         if super().is_valid_move(board, row_src, col_src, row_dest, col_dest) and self.is_diagonal_move(row_src, col_src, row_dest, col_dest):
             if self.is_clear_path(board, row_src, col_src, row_dest, col_dest):
@@ -317,10 +342,12 @@ class Bishop(Piece):
         return True
     
 class Rook(Piece):
+    __slots__ = ("has_moved",)
+    type = "rook"
+    CHARACTERS = {"white": "♖", "black": "♜"}
+
     def __init__(self, color, perspective, coordinates, pieces):
         super().__init__(color, perspective, coordinates, pieces)
-        self.type = "rook"
-        self.character = "♖" if self.color == "white" else "♜"
         self.has_moved = False
 
     def __repr__(self):
@@ -336,6 +363,9 @@ class Rook(Piece):
         else:
             return False
     
+    def generate_candidate_moves(self, board, row_src, col_src):
+        return self.generate_ray_moves(board, row_src, col_src, LINEAR_DIRECTIONS)
+
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         if super().is_valid_move(board, row_src, col_src, row_dest, col_dest) and self.is_linear_move(row_src, col_src, row_dest, col_dest):
             if self.is_clear_path(board, row_src, col_src, row_dest, col_dest):
@@ -373,10 +403,9 @@ class Rook(Piece):
         return True
     
 class Knight(Piece):
-    def __init__(self, color, perspective, coordinates, pieces):
-        super().__init__(color, perspective, coordinates, pieces)
-        self.type = "knight"
-        self.character = "♘" if self.color == "white" else "♞"
+    __slots__ = ()
+    type = "knight"
+    CHARACTERS = {"white": "♘", "black": "♞"}
 
     def __repr__(self):
         return "knight"
@@ -389,6 +418,9 @@ class Knight(Piece):
         else:
             return False
     
+    def generate_candidate_moves(self, board, row_src, col_src):
+        return KNIGHT_MOVES[row_src][col_src]
+
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         if super().is_valid_move(board, row_src, col_src, row_dest, col_dest):
             if self.is_l_shaped_move(row_src, col_src, row_dest, col_dest):
@@ -404,15 +436,17 @@ class Knight(Piece):
         return (dist_y == 2 and dist_x == 1) or (dist_y == 1 and dist_x == 2)
     
 class Pawn(Piece):
-    @dataclass
+    @dataclass(slots=True)
     class EnPassant:
         can_be_captured: bool
         num_turns_true: int
 
+    __slots__ = ("en_passant_capture", "has_moved")
+    type = "pawn"
+    CHARACTERS = {"white": "♙", "black": "♟"}
+
     def __init__(self, color, perspective, coordinates, pieces):
         super().__init__(color, perspective, coordinates, pieces)
-        self.type = "pawn"
-        self.character = "♙" if self.color == "white" else "♟"
         self.en_passant_capture = self.EnPassant(False, 0)
         self.has_moved = False
         
@@ -423,6 +457,9 @@ class Pawn(Piece):
         row_src, col_src, row_dest, col_dest = self.get_move_coordinates(position)
         if self.is_valid_move(board, row_src, col_src, row_dest, col_dest):
             self.perform_capture_if_capturable(board, row_src, col_src, row_dest, col_dest)
+            # Only a double step that is actually played makes the pawn capturable en passant, not one that is merely validated
+            if self.is_double_space_forward_move(row_src, col_src, row_dest, col_dest):
+                self.en_passant_capture.can_be_captured = True
             super().move_piece(board, row_src, col_src, row_dest, col_dest)
             if not self.has_moved:
                 self.has_moved = True
@@ -434,33 +471,48 @@ class Pawn(Piece):
             return False
 
     def is_final_rank(self):
-        return (self.color == "white" and self.coordinates[0] == 0) or (self.color == "black" and self.coordinates[0] == 7)
+        return (self.color == "white" and self.index >= 56) or (self.color == "black" and self.index < 8)
 
-    def promote_pawn(self, board):
-        while True:
+    def promote_pawn(self, board, PieceType=None):
+        while PieceType is None:
             new_piece = input('Choose a piece - Queen("Q"), Knight("N"), Rook("R") or Bishop("B"): ')
             if new_piece.upper() == "Q" or new_piece.title() == "Queen":
                 PieceType = Queen
-                break
             elif new_piece.upper() == "N" or new_piece.title() == "Knight":
                 PieceType = Knight
-                break
             elif new_piece.upper() == "R" or new_piece.title() == "Rook":
                 PieceType = Rook
-                break
             elif new_piece.upper() == "B" or new_piece.title() == "Bishop":
                 PieceType = Bishop
-                break
-            print("Invalid selection.")
+            else:
+                print("Invalid selection.")
         row, col = self.coordinates
-        board[row][col].piece = PieceType(self.color, self.perspective, self.coordinates)
+        promoted_piece = PieceType(self.color, self.perspective, self.coordinates, self.pieces)
+        if promoted_piece.type == "rook":
+            # A promoted rook can never take part in castling
+            promoted_piece.has_moved = True
+        board[row][col].piece = promoted_piece
+        self.pieces[self.pieces.index(self)] = promoted_piece
+        return promoted_piece
+
+    def generate_candidate_moves(self, board, row_src, col_src):
+        direction = self.get_forward_direction()
+        for row_offset, col_offset in ((direction, 0), (2 * direction, 0), (direction, -1), (direction, 1)):
+            row_dest, col_dest = row_src + row_offset, col_src + col_offset
+            if self.is_within_bounds(row_dest, col_dest):
+                yield row_dest, col_dest
+
+    def get_forward_direction(self):
+        if self.perspective == "white":
+            return -1 if self.color == "white" else 1
+        else:
+            return 1 if self.color == "white" else -1
 
     def is_valid_move(self, board, row_src, col_src, row_dest, col_dest):
         if self.is_within_bounds(row_dest, col_dest):
             if self.is_single_space_forward_move(row_src, col_src, row_dest, col_dest) and not self.is_occupied_square(board, row_dest, col_dest):
                 return True
             elif self.is_double_space_forward_move(row_src, col_src, row_dest, col_dest) and not self.is_occupied_square(board, row_dest, col_dest) and self.is_clear_path(board, row_src, col_src, row_dest) and not self.has_moved:
-                self.en_passant_capture.can_be_captured = True
                 return True
             elif self.is_diagonal_move(row_src, col_src, row_dest, col_dest):
                 if self.is_capturable_piece(board, row_src, col_src, row_dest, col_dest):
@@ -531,5 +583,5 @@ class Pawn(Piece):
             if board[current_row][col_src].piece is not None:
                 return False
         return True
-    
-    
\ No newline at end of file
+
+PROMOTION_TYPES = {"queen": Queen, "rook": Rook, "bishop": Bishop, "knight": Knight}
@@ -1,12 +1,20 @@
 from __future__ import annotations
 import sys
-from typing import Optional
+from typing import List, Optional
 from chess_attributes import ChessAttributes
+from move_generator import generate_legal_moves
+from renderer import BoardRenderer
+from search import DIFFICULTY_LIMITS, Search
+from time_control import TimeManager
+from transposition_table import TranspositionTable
+
+TRANSPOSITION_TABLE_MB = 16
 
 class Player(ChessAttributes):
     def __init__(self, perspective: str, color: str, is_cpu: bool, difficulty: Optional[str] = None, board: 'Board' = None):
         super().__init__()
         self.board = board
+        self.chess_board = None
         self.perspective = perspective
         self.color: str = color
         self.is_cpu: str = is_cpu
@@ -14,26 +22,93 @@ class Player(ChessAttributes):
         self.pieces = []
         self.valid_moves = []
         self.is_in_check = False
+        self.transposition_table = None # Created on the first CPU move; can be replaced to share one table between players
+        self.opening_book: Optional['OpeningBook'] = None # Consulted before searching when set
+        self.tablebase: Optional['Tablebase'] = None # Plays covered endings perfectly when set
+        self.parallel_search: Optional['ParallelSearch'] = None # Searches with several processes instead of one when set
+        self.clock: Optional['GameClock'] = None # When set, the CPU's thinking time comes from the clock
+        self.time_manager = TimeManager()
+        self.ponderer: Optional['Ponderer'] = None # When set, the CPU searches while the human player is choosing a move
+        self.renderer = BoardRenderer(perspective) # Can be replaced to share one incremental renderer between players
 
     def assign_board(self, board: 'Board'):
         self.board = board.board
+        self.chess_board = board
+
+    def generate_legal_moves(self) -> List['Move']:
+        return generate_legal_moves(self.chess_board, self.color)
 
     def take_turn(self):
         self.display_board()
-        self.update_en_passant_statuses()
         # if self.is_in_check():
 
         # else:
         print(f"{self.color.title()}'s turn to move.")
+        if self.is_cpu:
+            move = self.choose_cpu_move()
+            print(f"{self.color.title()} moves {move.src_pos} to {move.dest_pos}.")
+            self.chess_board.make_move(move)
+            return
+        if self.ponderer is not None:
+            self.ponderer.start(self.chess_board)
         while True:
             src_pos, dest_pos = self.get_player_input()
-            row, col = self.get_coords_from_pos(src_pos, self.perspective)
-            chosen_piece = self.board[row][col].piece
-            if chosen_piece.move_piece(self.board, dest_pos):
+            if move := self.find_legal_move(src_pos.lower(), dest_pos.lower()):
+                self.chess_board.make_move(move)
                 return
             else:
                 print("Invalid move.")
 
+    def find_legal_move(self, src_pos: str, dest_pos: str) -> Optional['Move']:
+        src, dest = self.get_index_from_pos(src_pos), self.get_index_from_pos(dest_pos)
+        matching_moves = [move for move in self.generate_legal_moves() if move.src == src and move.dest == dest]
+        if len(matching_moves) > 1:
+            # Only promotions share a source and destination square
+            promotion = self.get_promotion_choice()
+            return next(move for move in matching_moves if move.promotion == promotion)
+        return matching_moves[0] if matching_moves else None
+
+    def get_promotion_choice(self) -> str:
+        while True:
+            new_piece = input('Choose a piece - Queen("Q"), Knight("N"), Rook("R") or Bishop("B"): ')
+            if new_piece.upper() == "Q" or new_piece.title() == "Queen":
+                return "queen"
+            elif new_piece.upper() == "N" or new_piece.title() == "Knight":
+                return "knight"
+            elif new_piece.upper() == "R" or new_piece.title() == "Rook":
+                return "rook"
+            elif new_piece.upper() == "B" or new_piece.title() == "Bishop":
+                return "bishop"
+            print("Invalid selection.")
+
+    def choose_cpu_move(self, difficulty: Optional[str] = None) -> 'Move':
+        # Stopping the pondering first, whichever way the move is chosen
+        pondered_move = self.ponderer.get_move(self.chess_board) if self.ponderer is not None else None
+        if self.opening_book is not None and (move := self.opening_book.choose_move(self.chess_board)):
+            return move
+        if self.tablebase is not None and (move := self.tablebase.best_move(self.chess_board)):
+            return move
+        if pondered_move is not None:
+            return pondered_move
+        limits = self.get_search_limits(difficulty)
+        if self.parallel_search is not None:
+            return self.parallel_search.find_best_move(self.chess_board, limits)
+        search = Search(self.chess_board, self.get_transposition_table(), limits)
+        return search.find_best_move()
+
+    def get_search_limits(self, difficulty: Optional[str] = None) -> 'SearchLimits':
+        limits = DIFFICULTY_LIMITS[difficulty or self.difficulty]
+        if self.clock is not None:
+            limits = self.time_manager.get_limits(self.clock.get_remaining(self.color), self.clock.increment, limits)
+        return limits
+
+    def get_transposition_table(self) -> TranspositionTable:
+        if self.parallel_search is not None:
+            return self.parallel_search.transposition_table
+        if self.transposition_table is None:
+            self.transposition_table = TranspositionTable(TRANSPOSITION_TABLE_MB)
+        return self.transposition_table
+
     def get_player_input(self):
         while True:
             while True:
@@ -53,9 +128,9 @@ class Player(ChessAttributes):
         return src_pos, dest_pos
     
     def show_valid_moves(self, src_pos):
-        row, col = self.get_coords_from_pos(src_pos, self.perspective)
-        chosen_piece = self.board[row][col].piece
-        self.valid_moves = chosen_piece.list_valid_moves(self.board, row, col)
+        # Highlights the same moves that find_legal_move accepts, so pinned pieces and moves into check are left out
+        src = self.get_index_from_pos(src_pos.lower())
+        self.valid_moves = sorted({self.get_coords_from_index(move.dest, self.perspective) for move in self.generate_legal_moves() if move.src == src})
         self.display_board()
         self.valid_moves = []
 
@@ -85,52 +160,5 @@ class Player(ChessAttributes):
             print("Black resigned. White wins the game.")
         sys.exit()
 
-    def update_en_passant_statuses(self):
-        for piece in self.pieces:
-            if piece.type == "pawn" and piece.en_passant_capture.can_be_captured:
-                # If the pawn can be captured, and has been in this state for less than one turn, increment num_turns_true by one
-                if piece.en_passant_capture.num_turns_true == 0:
-                    piece.en_passant_capture.num_turns_true += 1
-                # If the pawn has been in this state for one or more turns, reset can_be_captured to False and num_turns_true to zero
-                elif piece.en_passant_capture.num_turns_true > 0:
-                    piece.en_passant_capture.can_be_captured = False
-                    piece.en_passant_capture.num_turns_true = 0
-
     def display_board(self):
-        for row in range(self.BOARD_SIZE + 1):
-            for col in range(self.BOARD_SIZE + 1):
-                if (row == self.BOARD_SIZE) or (col == 0):
-                    if (row == self.BOARD_SIZE) and (col == 0):
-                        print("  ", end="")
-                    position = self.get_pos_from_coords((row, col), self.perspective)
-                    if row == self.BOARD_SIZE and col < self.BOARD_SIZE:
-                        print(f" {position[0].upper()}", end="")
-                    elif col == 0:
-                        print(f" {position[1]}", end="")
-                else:
-                    if (row, col - 1) in self.valid_moves:
-                        sq_color = self.get_move_highlight_color(row, col - 1)
-                    else:
-                        sq_color = self.convert_color_to_escape_code(row, col - 1)
-                    if chess_piece := self.board[row][col - 1].piece:
-                        character = chess_piece.character
-                        print(f"\033[30;{sq_color}m {character}", end="")
-                        print("\033[0m", end="")
-                    else:
-                        print(f"\033[30;{sq_color}m  ", end="")
-                        print("\033[0m", end="")
-            print()
-
-    def convert_color_to_escape_code(self, row, col):
-        color = self.board[row][col].color
-        if color == "white":
-            return "107"
-        else:
-            return "104"
-        
-    def get_move_highlight_color(self, row, col):
-        color = self.board[row][col].color
-        if color == "white":
-            return "101"
-        else:
-            return "41"
\ No newline at end of file
+        self.renderer.draw(self.board, self.valid_moves)
\ No newline at end of file
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import threading
+from typing import List, Optional
+from board import Board
+from move import Move
+from move_generator import generate_legal_moves
+from search import Search, SearchLimits
+
+PREDICTION_LIMITS = SearchLimits(max_nodes=2000, max_depth=3) # Used when the table holds no move for the human's turn
+
+class Ponderer:
+    """
+    Searches on the human's time. While the human is choosing a move, a background thread guesses the reply (the
+    transposition table's best move for the human, or a short search) and searches the position after it for the CPU,
+    on its own copy of the board. The search stores into the CPU's transposition table, so even a search that is cut
+    short leaves entries that the CPU's next search starts from.
+
+    The thread spends most of its time in the search while the main thread waits in input(), so it hardly slows the
+    human's side down.
+    """
+    def __init__(self, player: 'Player') -> None:
+        self.player = player # The CPU player that the pondering is for
+        self.transposition_table: Optional['TranspositionTable'] = None # The CPU's table, fetched again for every ponder search
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.predicted_move: Optional[Move] = None
+        self.ponder_key: Optional[int] = None # Zobrist key of the position being searched
+        self.best_move: Optional[Move] = None # Set when the ponder search finished before being stopped
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, board: Board) -> None:
+        """
+        Starts pondering on the position where the human is to move.
+        """
+        self.stop()
+        self.stop_event.clear()
+        self.predicted_move = self.ponder_key = self.best_move = None
+        # The player's table can be replaced between moves, and the ponder search must fill the one its search reads
+        self.transposition_table = self.player.get_transposition_table()
+        # The CPU's own limits, so that a finished ponder search can stand in for its search
+        limits = self.player.get_search_limits()
+        self.thread = threading.Thread(target=self.ponder, args=(board.to_fen(), list(board.key_history), limits), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def ponder(self, fen: str, key_history: List[int], limits: SearchLimits) -> None:
+        board = Board.from_fen(fen)
+        # The game's earlier positions, so that the ponder search sees repetitions like the CPU's own search
+        board.key_history = key_history
+        predicted_move = self.predict_move(board)
+        if predicted_move is None or self.stop_event.is_set():
+            return
+        board.make_move(predicted_move)
+        self.predicted_move, self.ponder_key = predicted_move, board.zobrist_key
+        best_move = Search(board, self.transposition_table, limits, self.stop_event).find_best_move()
+        if not self.stop_event.is_set():
+            self.best_move = best_move
+
+    def predict_move(self, board: Board) -> Optional[Move]:
+        legal_moves = generate_legal_moves(board, board.current_turn)
+        entry = self.transposition_table.probe(board.zobrist_key)
+        if entry is not None and entry.best_move in legal_moves:
+            return entry.best_move
+        if not legal_moves:
+            return None
+        return Search(board, self.transposition_table, PREDICTION_LIMITS, self.stop_event).find_best_move()
+
+    def get_move(self, board: Board) -> Optional[Move]:
+        """
+        Stops pondering and returns the move the ponder search found, if the human played the predicted move and the
+        search had finished. Otherwise the CPU searches normally, from the entries the ponder search left behind.
+        """
+        self.stop()
+        if self.ponder_key is None:
+            return None
+        if board.zobrist_key != self.ponder_key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.best_move
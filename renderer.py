@@ -0,0 +1,85 @@
+from __future__ import annotations
+import sys
+from typing import Iterable, List, Optional, TextIO, Tuple
+from chess_attributes import ChessAttributes
+
+RESET = "\033[0m"
+CLEAR_SCREEN = "\033[2J\033[H"
+SAVE_CURSOR = "\0337"
+RESTORE_CURSOR = "\0338"
+RESET_SCROLL_REGION = "\033[r"
+SQUARE_COLOR_CODES = {"white": "107", "black": "104"}
+HIGHLIGHT_COLOR_CODES = {"white": "101", "black": "41"}
+LABEL_WIDTH = 2 # Rank label in front of each row
+SQUARE_WIDTH = 2
+
+class BoardRenderer(ChessAttributes):
+    """
+    Draws the board on a terminal. Every frame is built in one buffer and written with a single call.
+
+    In incremental mode the first frame clears the screen and pins the board to the top, with the rest of the game's
+    output scrolling in the region below it. Later frames only move the cursor to the squares that changed and redraw those.
+    """
+    def __init__(self, perspective: str, incremental: bool = False, output: Optional[TextIO] = None) -> None:
+        self.perspective = perspective
+        self.incremental = incremental
+        self.output = output # Defaults to whatever sys.stdout is at drawing time
+        self.cells = None # (character, color code) of every square as last drawn in incremental mode
+
+    def draw(self, board: List[List['Square']], highlights: Iterable[Tuple[int, int]] = ()) -> None:
+        cells = self.get_cells(board, highlights)
+        if not self.incremental:
+            frame = self.format_frame(cells)
+        elif self.cells is None:
+            # The board takes the top lines of the screen and everything else scrolls below it
+            text_line = self.BOARD_SIZE + 2
+            frame = CLEAR_SCREEN + self.format_frame(cells) + f"\033[{text_line}r\033[{text_line};1H"
+        else:
+            frame = self.format_changes(cells)
+        if self.incremental:
+            self.cells = cells
+        output = self.output or sys.stdout
+        output.write(frame)
+        output.flush()
+
+    def close(self) -> None:
+        """
+        Gives the whole screen back to scrolling output after an incremental session.
+        """
+        if self.incremental and self.cells is not None:
+            output = self.output or sys.stdout
+            output.write(SAVE_CURSOR + RESET_SCROLL_REGION + RESTORE_CURSOR)
+            output.flush()
+        self.cells = None
+
+    def get_cells(self, board, highlights):
+        highlights = set(highlights)
+        cells = []
+        for row, squares in enumerate(board):
+            cells.append([(square.piece.character if square.piece else " ", (HIGHLIGHT_COLOR_CODES if (row, col) in highlights else SQUARE_COLOR_CODES)[square.color]) for col, square in enumerate(squares)])
+        return cells
+
+    def format_cell(self, cell) -> str:
+        character, color_code = cell
+        return f"\033[30;{color_code}m {character}{RESET}"
+
+    def format_frame(self, cells) -> str:
+        buffer = []
+        for row, row_cells in enumerate(cells):
+            buffer.append(f" {self.get_pos_from_coords((row, 0), self.perspective)[1]}")
+            buffer.extend(self.format_cell(cell) for cell in row_cells)
+            buffer.append("\n")
+        buffer.append(" " * LABEL_WIDTH)
+        buffer.extend(f" {self.get_pos_from_coords((0, col), self.perspective)[0].upper()}" for col in range(self.BOARD_SIZE))
+        buffer.append("\n")
+        return "".join(buffer)
+
+    def format_changes(self, cells) -> str:
+        buffer = [SAVE_CURSOR]
+        for row, row_cells in enumerate(cells):
+            for col, cell in enumerate(row_cells):
+                if cell != self.cells[row][col]:
+                    # Screen lines and columns are counted from 1
+                    buffer.append(f"\033[{row + 1};{LABEL_WIDTH + SQUARE_WIDTH * col + 1}H{self.format_cell(cell)}")
+        buffer.append(RESTORE_CURSOR)
+        return "".join(buffer) if len(buffer) > 2 else ""
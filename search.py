@@ -0,0 +1,246 @@
+from __future__ import annotations
+import time
+from typing import NamedTuple, Optional
+from evaluation import PIECE_VALUES
+from move_generator import generate_legal_moves, is_in_check
+from move_ordering import MAX_PLY, MoveOrderer
+from transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+MATE_SCORE = 30000
+MATE_THRESHOLD = MATE_SCORE - 1000 # Scores beyond this are mates, stored relative to the node in the transposition table
+INFINITY = MATE_SCORE + 1
+MAX_DEPTH = 64
+NODES_PER_TIME_CHECK = 256
+INSTABILITY_EXTENSION = 1.5 # Soft time limit factor applied whenever an iteration changes the best move
+DELTA_MARGIN = 200 # Positional swing allowed on top of a capture's material gain before it is pruned in quiescence
+
+class SearchLimits(NamedTuple):
+    max_nodes: Optional[int] = None
+    max_time: Optional[float] = None # Seconds
+    max_depth: int = MAX_DEPTH
+    soft_time: Optional[float] = None # Seconds the search is planned to take, extended while the best move changes
+
+# Each difficulty is bounded by a node budget and a time budget, whichever runs out first
+DIFFICULTY_LIMITS = {
+    "easy": SearchLimits(max_nodes=1000, max_time=0.5, max_depth=2),
+    "medium": SearchLimits(max_nodes=10000, max_time=2.0),
+    "hard": SearchLimits(max_nodes=100000, max_time=6.0),
+}
+
+class SearchTimeout(Exception):
+    pass
+
+class Search:
+    """
+    Iterative-deepening negamax alpha-beta search of the side to move on a board. Each iteration starts from the best
+    move of the previous one, and the search stops as soon as the node or time budget is spent, returning the best
+    move found so far. It also stops when stop_event (a multiprocessing.Event) is set, which is how the processes of a
+    parallel search are called off together.
+    """
+    def __init__(self, board: 'Board', transposition_table: TranspositionTable = None, limits: SearchLimits = SearchLimits(), stop_event=None, start_depth: int = 1) -> None:
+        self.board = board
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.limits = limits
+        self.stop_event = stop_event
+        self.start_depth = start_depth # First iteration, skipped ahead by some parallel search helpers
+        self.nodes = 0
+        self.depth = 0 # Deepest completed iteration
+        self.score = 0
+        self.best_move = None
+        self.start_time = 0.0
+        self.path_keys = []
+        self.move_orderer = MoveOrderer()
+
+    def find_best_move(self) -> Optional['Move']:
+        self.start_time = time.perf_counter()
+        self.nodes = 0
+        self.transposition_table.new_search()
+        # Positions since the last capture or pawn move can be repeated, whether they came up in the game or on the search path
+        key_history = self.board.key_history
+        self.path_keys = key_history[max(0, len(key_history) - self.board.halfmove_clock):] + [self.board.zobrist_key]
+        root_moves = generate_legal_moves(self.board, self.board.current_turn)
+        if not root_moves:
+            return None
+        self.best_move = root_moves[0]
+        if len(root_moves) == 1:
+            # A forced move needs no search
+            return self.best_move
+        soft_time = self.limits.soft_time
+        for depth in range(self.start_depth, self.limits.max_depth + 1):
+            previous_best_move = self.best_move
+            try:
+                self.search_root(root_moves, depth)
+            except SearchTimeout:
+                break
+            self.depth = depth
+            if abs(self.score) > MATE_THRESHOLD:
+                break
+            if soft_time is not None:
+                if depth > self.start_depth and self.best_move != previous_best_move:
+                    # The search has not settled on a move yet, so it is worth spending more of the budget
+                    soft_time *= INSTABILITY_EXTENSION
+                # The next iteration usually takes longer than all the previous ones together, so one that could not
+                # finish in the planned time is not started
+                if self.get_elapsed_time() >= soft_time / 2:
+                    break
+        return self.best_move
+
+    def search_root(self, root_moves, depth: int) -> None:
+        # Searching the previous best move first lets a partially completed iteration still improve on it
+        root_moves.sort(key=lambda move: move != self.best_move)
+        alpha = -INFINITY
+        best_move = None
+        for move in root_moves:
+            self.board.make_move(move)
+            try:
+                score = -self.alpha_beta(depth - 1, -INFINITY, -alpha, 1)
+            finally:
+                self.board.unmake_move()
+            if score > alpha:
+                alpha = score
+                best_move = move
+                # Any move that beats the previous best in an unfinished iteration is still a safe choice
+                self.best_move = move
+                self.score = score
+        self.transposition_table.store(self.board.zobrist_key, depth, alpha, EXACT, best_move)
+
+    def alpha_beta(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.count_node()
+        board = self.board
+        key = board.zobrist_key
+        if key in self.path_keys:
+            # Repeating a position of the game or of the current line is scored as a draw
+            return 0
+        entry = self.transposition_table.probe(key)
+        tt_move = None
+        if entry:
+            tt_move = entry.best_move
+            if entry.depth >= depth:
+                score = get_score_from_table(entry.score, ply)
+                if entry.bound == EXACT or (entry.bound == LOWER_BOUND and score >= beta) or (entry.bound == UPPER_BOUND and score <= alpha):
+                    return score
+        if depth <= 0:
+            return self.quiescence(alpha, beta, ply)
+
+        moves = generate_legal_moves(board, board.current_turn)
+        if not moves:
+            return -MATE_SCORE + ply if is_in_check(board, board.current_turn) else 0
+        self.move_orderer.order_moves(board, moves, tt_move, ply)
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        self.path_keys.append(key)
+        try:
+            for move in moves:
+                board.make_move(move)
+                try:
+                    score = -self.alpha_beta(depth - 1, -beta, -alpha, ply + 1)
+                finally:
+                    board.unmake_move()
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            self.move_orderer.record_cutoff(board, move, ply, depth)
+                            break
+        finally:
+            self.path_keys.pop()
+
+        if best_score >= beta:
+            bound = LOWER_BOUND
+        elif best_score > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER_BOUND
+        self.transposition_table.store(key, depth, get_score_for_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def quiescence(self, alpha: int, beta: int, ply: int) -> int:
+        """
+        Resolves captures and queen promotions beyond the nominal depth, so that positions are only evaluated once they
+        are quiet. The side to move may stand pat on the static evaluation instead of capturing, and captures that
+        cannot raise the score to alpha even with DELTA_MARGIN to spare are skipped. In check, every evasion is searched.
+        The node itself is counted by the caller.
+        """
+        board = self.board
+        in_check = is_in_check(board, board.current_turn)
+        moves = generate_legal_moves(board, board.current_turn)
+        if not moves:
+            return -MATE_SCORE + ply if in_check else 0
+        if ply >= MAX_PLY:
+            return self.evaluate()
+        if in_check:
+            best_score = -INFINITY
+            stand_pat = None
+        else:
+            best_score = stand_pat = self.evaluate()
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = [move for move in moves if move.promotion in (None, "queen") and not self.move_orderer.is_quiet(board, move)]
+        self.move_orderer.order_moves(board, moves, None, ply)
+        for move in moves:
+            if stand_pat is not None and stand_pat + get_material_gain(board, move) + DELTA_MARGIN <= alpha:
+                continue
+            board.make_move(move)
+            try:
+                self.count_node()
+                score = -self.quiescence(-beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def evaluate(self) -> int:
+        """
+        Material and piece-square score from the point of view of the side to move, as kept up to date by the board.
+        """
+        score = self.board.score
+        return score if self.board.current_turn == "white" else -score
+
+    def count_node(self) -> None:
+        self.nodes += 1
+        if self.limits.max_nodes is not None and self.nodes >= self.limits.max_nodes:
+            raise SearchTimeout()
+        if self.nodes % NODES_PER_TIME_CHECK == 0:
+            if self.limits.max_time is not None and self.get_elapsed_time() >= self.limits.max_time:
+                raise SearchTimeout()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+
+    def get_elapsed_time(self) -> float:
+        return time.perf_counter() - self.start_time
+
+def get_material_gain(board: 'Board', move: 'Move') -> int:
+    # Value of the captured piece plus what a promotion adds, for delta pruning
+    victim = board.get_piece_at(move.dest)
+    gain = PIECE_VALUES[victim.type] if victim is not None else 0
+    if victim is None and move.src % 8 != move.dest % 8 and board.get_piece_at(move.src).type == "pawn":
+        # En passant
+        gain = PIECE_VALUES["pawn"]
+    if move.promotion is not None:
+        gain += PIECE_VALUES[move.promotion] - PIECE_VALUES["pawn"]
+    return gain
+
+def get_score_for_table(score: int, ply: int) -> int:
+    # Mate scores are stored as distance from this node rather than from the root
+    if score > MATE_THRESHOLD:
+        return score + ply
+    elif score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+def get_score_from_table(score: int, ply: int) -> int:
+    if score > MATE_THRESHOLD:
+        return score - ply
+    elif score < -MATE_THRESHOLD:
+        return score + ply
+    return score
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from game import Game
+from move import Move
+from transposition_table import TranspositionTable
+
+MAX_PLIES = 300
+TRANSPOSITION_TABLE_MB = 16
+
+# Each worker process keeps one transposition table for all of its games, so its memory stays fixed
+worker_transposition_table = None
+
+def initialize_worker(transposition_table_mb: float) -> None:
+    global worker_transposition_table
+    worker_transposition_table = TranspositionTable(transposition_table_mb)
+
+def play_game(game_number: int, difficulty: str, random_plies: int, max_plies: int, seed: int) -> Dict:
+    """
+    Plays one CPU-vs-CPU game on its own board. The first random_plies moves are chosen at random, so that the
+    deterministic search does not play the same game every time.
+    """
+    start_time = time.perf_counter()
+    game = Game("white", True, difficulty)
+    game.white_player.transposition_table = worker_transposition_table
+    game.black_player.transposition_table = worker_transposition_table
+    rng = random.Random(seed + game_number)
+    while game.result() is None and len(game.moves) < max_plies:
+        if len(game.moves) < random_plies:
+            game.push(rng.choice(game.legal_moves()))
+        else:
+            game.play_cpu_move(difficulty)
+    return {
+        "game": game_number,
+        "result": game.result() or "unfinished",
+        "plies": len(game.moves),
+        "moves": game.get_uci_moves(),
+        "seconds": round(time.perf_counter() - start_time, 3),
+        "worker": os.getpid(),
+    }
+
+def read_selfplay_games(path: str) -> Iterator[Tuple[List[Move], Optional[str]]]:
+    """
+    Reads back the games written by run_self_play as their moves and results. The moves are replayed to turn UCI
+    castling back into the king moving onto its rook. Files written before the moves were UCI are read as well.
+    """
+    with open(path) as jsonl_file:
+        for line in jsonl_file:
+            record = json.loads(line)
+            game = Game()
+            yield [game.push(text) for text in record["moves"]], record["result"]
+
+def play_game_from_arguments(arguments) -> Dict:
+    return play_game(*arguments)
+
+def run_self_play(num_games: int, num_workers: int, difficulty: str, output_path: str, random_plies: int = 4, max_plies: int = MAX_PLIES, seed: int = 0, transposition_table_mb: float = TRANSPOSITION_TABLE_MB) -> None:
+    start_time = time.perf_counter()
+    busy_time = {}
+    results = {}
+    tasks = [(game_number, difficulty, random_plies, max_plies, seed) for game_number in range(num_games)]
+    with multiprocessing.Pool(num_workers, initializer=initialize_worker, initargs=(transposition_table_mb,)) as pool, open(output_path, "w") as output_file:
+        # Games are written as soon as they finish, whatever order they finish in
+        for record in pool.imap_unordered(play_game_from_arguments, tasks):
+            output_file.write(json.dumps(record) + "\n")
+            busy_time[record["worker"]] = busy_time.get(record["worker"], 0.0) + record["seconds"]
+            results[record["result"]] = results.get(record["result"], 0) + 1
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Played {num_games} games in {elapsed:.2f}s ({num_games / elapsed:.2f} games/s) with {num_workers} workers.")
+    print("Results: " + ", ".join(f"{result} {count}" for result, count in sorted(results.items())))
+    for worker, seconds in sorted(busy_time.items()):
+        print(f"Worker {worker}: busy {seconds:.2f}s ({100 * seconds / elapsed:.0f}% utilization)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play CPU-vs-CPU games in parallel and write their results and moves to disk.")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="easy", help="CPU difficulty for both sides")
+    parser.add_argument("--output", default="selfplay.jsonl", help="file to write one JSON record per game to")
+    parser.add_argument("--random-plies", type=int, default=4, help="number of random opening moves per game")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="number of half moves after which a game is abandoned")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random opening moves")
+    parser.add_argument("--hash", type=float, default=TRANSPOSITION_TABLE_MB, help="transposition table size per worker in MB")
+    args = parser.parse_args()
+    run_self_play(args.games, args.workers, args.difficulty, args.output, args.random_plies, args.max_plies, args.seed, args.hash)
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,37 @@ from chess_attributes import ChessAttributes
 BOARD_SIZE = 8
 
 class Square(ChessAttributes):
-    def __init__(self, coordinates: Tuple[int, int], perspective: str) -> None:
-        super().__init__()
-        self.coordinates: Tuple[int, int] = coordinates
+    __slots__ = ("coordinates", "perspective", "index", "position", "color", "chess_board", "_piece")
+
+    def __init__(self, coordinates: Tuple[int, int], perspective: str, chess_board: 'Board' = None) -> None:
         self.perspective = perspective
-        self.position: str = self.get_pos_from_coords(coordinates, self.perspective)
+        self.index: int = self.get_index_from_coords(coordinates, self.perspective) # Bitboard index (a1 = 0, h8 = 63)
+        # Coordinates and position are shared with the lookup tables instead of being stored per square
+        self.coordinates: Tuple[int, int] = self.get_coords_from_index(self.index, self.perspective)
+        self.position: str = self.get_pos_from_index(self.index)
         self.color: str = None # Color of the square ("black" or "white")
-        self.piece: str = None
+        self.chess_board = chess_board
+        self._piece: 'Piece' = None
 
     def __repr__(self):
         return f"{self.piece.color.title()} {self.piece} on {self.position}" if self.piece else f"Blank square at {self.position}"
+
+    @property
+    def piece(self) -> 'Piece':
+        return self._piece
+
+    @piece.setter
+    def piece(self, piece: 'Piece') -> None:
+        # Every placement goes through the board so that its bitboards stay in sync with the grid
+        if self.chess_board is not None:
+            self.chess_board.update_square(self.index, self._piece, piece)
+        self._piece = piece
+
+    def load_piece(self, piece: 'Piece') -> None:
+        """
+        Sets the piece without updating the board, for loading a whole position before the board rebuilds its bitboards in one pass.
+        """
+        self._piece = piece
     
     def add_piece(self):
         pass
-
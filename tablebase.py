@@ -0,0 +1,392 @@
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from bitboard import KING_ATTACKS, PIECE_INDICES, PIECE_TYPES, get_piece_attacks, iterate_squares
+from board import Board
+from move_generator import generate_legal_moves
+
+# Every table covers a lone king against a king and the listed pieces. In the tables the strong side is white; positions
+# with a black strong side are probed with the board flipped vertically.
+TABLES = {"KQK": ("queen",), "KRK": ("rook",), "KPK": ("pawn",), "KBNK": ("bishop", "knight")}
+# Tables that KPK positions promote into. Knight and bishop promotions leave a drawn ending.
+PROMOTION_TABLES = {"queen": "KQK", "rook": "KRK"}
+WHITE_TO_MOVE, BLACK_TO_MOVE = 0, 1
+FILE_MIRROR, RANK_MIRROR = 7, 56 # XOR masks that mirror a square index left-right and top-bottom
+# One byte per position: 0 for draws and illegal positions, otherwise the strong side wins and the byte is the distance
+# to mate in plies plus one
+MAX_DISTANCE = 0xFF - 1
+ESCAPE = 0xFF # Move count of positions where the lone king can capture a piece, and so is never lost
+
+MAGIC = b"CHTB"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH") # Magic, version, number of tables
+TABLE_HEADER = struct.Struct("<8sQQ") # Name, offset of the table in the file, size in bytes
+DEFAULT_TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase.bin")
+
+class TablebaseResult(NamedTuple):
+    wdl: int # 1 if the side to move wins, 0 for a draw, -1 if it loses
+    dtm: Optional[int] # Plies to mate with best play, None for draws
+
+DRAW = TablebaseResult(0, None)
+
+class TableLayout:
+    """
+    Numbering of the positions of one table. The white king is kept on the left half of the board (and for tables
+    without pawns, on the bottom half too) by mirroring, so each table stores a quarter (or half) of all placements.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pieces = TABLES[name]
+        self.has_pawns = "pawn" in self.pieces
+        self.king_slots = 32 if self.has_pawns else 16
+        self.size = 2 * self.king_slots * 64 ** (len(self.pieces) + 1)
+
+    def get_index(self, side_to_move: int, squares: Tuple[int, ...]) -> int:
+        """
+        Returns the index of a position given as the side to move and the squares of the white king, the black king and
+        the table's pieces in order.
+        """
+        white_king = squares[0]
+        mirror = FILE_MIRROR if white_king & 7 >= 4 else 0
+        if white_king >= 32 and not self.has_pawns:
+            mirror |= RANK_MIRROR
+        white_king ^= mirror
+        index = side_to_move * self.king_slots + (white_king >> 3) * 4 + (white_king & 7)
+        for square in squares[1:]:
+            index = index * 64 + (square ^ mirror)
+        return index
+
+    def get_position(self, index: int) -> Tuple[int, Tuple[int, ...]]:
+        squares = []
+        for _ in range(len(self.pieces) + 1):
+            squares.append(index & 63)
+            index >>= 6
+        side_to_move, king_slot = divmod(index, self.king_slots)
+        squares.append((king_slot >> 2) * 8 + (king_slot & 3))
+        return side_to_move, tuple(reversed(squares))
+
+    def get_white_attacks(self, squares: Tuple[int, ...], occupied: int, skipped: int = -1) -> int:
+        # Squares attacked by white, leaving out the piece on the skipped square (a piece the black king captures)
+        attacks = KING_ATTACKS[squares[0]]
+        for piece_type, square in zip(self.pieces, squares[2:]):
+            if square != skipped:
+                attacks |= get_piece_attacks("white", piece_type, square, occupied)
+        return attacks
+
+    def is_legal(self, side_to_move: int, squares: Tuple[int, ...]) -> bool:
+        occupied = get_occupancy(squares)
+        if occupied.bit_count() != len(squares) or KING_ATTACKS[squares[0]] >> squares[1] & 1:
+            return False
+        for piece_type, square in zip(self.pieces, squares[2:]):
+            if piece_type == "pawn" and not 8 <= square < 56:
+                return False
+        # The side that just moved cannot have left its king in check, and only white can give check
+        return side_to_move == BLACK_TO_MOVE or not self.get_white_attacks(squares, occupied) >> squares[1] & 1
+
+    def get_black_moves(self, squares: Tuple[int, ...]) -> Tuple[List[Tuple[int, ...]], bool, bool]:
+        """
+        Returns the positions the black king can move to without a capture, whether it can capture a piece instead, and
+        whether it is in check.
+        """
+        white_king, black_king = squares[0], squares[1]
+        occupied = get_occupancy(squares)
+        # The black king does not block the rays of the pieces attacking it
+        attacks = self.get_white_attacks(squares, occupied ^ (1 << black_king))
+        children = []
+        can_capture = False
+        for target in iterate_squares(KING_ATTACKS[black_king] & ~KING_ATTACKS[white_king] & ~(1 << white_king)):
+            if occupied >> target & 1:
+                if not can_capture and not self.get_white_attacks(squares, occupied ^ (1 << black_king), target) >> target & 1:
+                    can_capture = True
+            elif not attacks >> target & 1:
+                children.append((white_king, target) + squares[2:])
+        in_check = bool(self.get_white_attacks(squares, occupied) >> black_king & 1)
+        return children, can_capture, in_check
+
+    def get_white_moves(self, squares: Tuple[int, ...]) -> Tuple[List[Tuple[int, ...]], List[Tuple[str, Tuple[int, ...]]]]:
+        """
+        Returns the positions white can move to within the table, and the promotions as (table name, squares) pairs.
+        """
+        white_king, black_king = squares[0], squares[1]
+        occupied = get_occupancy(squares)
+        children = [(target,) + squares[1:] for target in iterate_squares(KING_ATTACKS[white_king] & ~occupied & ~KING_ATTACKS[black_king])]
+        promotions = []
+        for piece_number, (piece_type, square) in enumerate(zip(self.pieces, squares[2:]), start=2):
+            if piece_type == "pawn":
+                targets = get_pawn_pushes(square, occupied)
+            else:
+                targets = get_piece_attacks("white", piece_type, square, occupied) & ~occupied
+            for target in iterate_squares(targets):
+                if piece_type == "pawn" and target >= 56:
+                    # Only KPK has pawns, so the promoted piece is the only one left besides the kings
+                    promotions.extend((table, (white_king, black_king, target)) for table in PROMOTION_TABLES.values())
+                else:
+                    children.append(squares[:piece_number] + (target,) + squares[piece_number + 1:])
+        return children, promotions
+
+    def get_black_unmoves(self, squares: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """
+        Returns the positions with black to move from which a black king move leads to this position.
+        """
+        white_king, black_king = squares[0], squares[1]
+        occupied = get_occupancy(squares)
+        return [(white_king, source) + squares[2:] for source in iterate_squares(KING_ATTACKS[black_king] & ~occupied & ~KING_ATTACKS[white_king])]
+
+    def get_white_unmoves(self, squares: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """
+        Returns the positions with white to move from which a white move other than a promotion leads to this position.
+        """
+        white_king, black_king = squares[0], squares[1]
+        occupied = get_occupancy(squares)
+        parents = [(source,) + squares[1:] for source in iterate_squares(KING_ATTACKS[white_king] & ~occupied & ~KING_ATTACKS[black_king])]
+        for piece_number, (piece_type, square) in enumerate(zip(self.pieces, squares[2:]), start=2):
+            if piece_type == "pawn":
+                sources = get_pawn_unpushes(square, occupied)
+            else:
+                sources = get_piece_attacks("white", piece_type, square, occupied) & ~occupied
+            parents.extend(squares[:piece_number] + (source,) + squares[piece_number + 1:] for source in iterate_squares(sources))
+        # White cannot have moved with the black king in check
+        return [parent for parent in parents if not self.get_white_attacks(parent, get_occupancy(parent)) >> black_king & 1]
+
+def get_occupancy(squares: Iterable[int]) -> int:
+    occupied = 0
+    for square in squares:
+        occupied |= 1 << square
+    return occupied
+
+def get_pawn_pushes(square: int, occupied: int) -> int:
+    targets = 0
+    if not occupied >> (square + 8) & 1:
+        targets |= 1 << (square + 8)
+        if square < 16 and not occupied >> (square + 16) & 1:
+            targets |= 1 << (square + 16)
+    return targets
+
+def get_pawn_unpushes(square: int, occupied: int) -> int:
+    sources = 0
+    if square >= 16 and not occupied >> (square - 8) & 1:
+        sources |= 1 << (square - 8)
+        if 24 <= square < 32 and not occupied >> (square - 16) & 1:
+            sources |= 1 << (square - 16)
+    return sources
+
+def generate_table(name: str, tables: Dict[str, bytes]) -> bytearray:
+    """
+    Solves one table by retrograde analysis. Starting from the positions where black is mated, positions are visited in
+    order of their distance to mate through the moves that lead to them: a position with white to move is won as soon as
+    one move reaches a lost position, and a position with black to move is lost once every one of its moves reaches a
+    won position. Tables that the table's promotions lead into must be in tables already.
+    """
+    layout = TableLayout(name)
+    values = bytearray(layout.size)
+    move_counts = bytearray(layout.size) # Black moves not yet known to lose, for positions with black to move
+    buckets: List[List[int]] = [[]] # Positions to visit at each distance to mate
+
+    def add(distance: int, index: int) -> None:
+        if distance > MAX_DISTANCE:
+            raise ValueError(f"Distance to mate too long to store in {name}")
+        while len(buckets) <= distance:
+            buckets.append([])
+        buckets[distance].append(index)
+
+    for index in range(layout.size):
+        side_to_move, squares = layout.get_position(index)
+        if not layout.is_legal(side_to_move, squares):
+            continue
+        if side_to_move == BLACK_TO_MOVE:
+            children, can_capture, in_check = layout.get_black_moves(squares)
+            if can_capture:
+                move_counts[index] = ESCAPE
+            elif children:
+                move_counts[index] = len(children)
+            elif in_check:
+                values[index] = 1
+                add(0, index)
+        elif layout.has_pawns and max(squares[2:]) >= 48:
+            for table_name, promoted in layout.get_white_moves(squares)[1]:
+                if value := tables[table_name][TableLayout(table_name).get_index(BLACK_TO_MOVE, promoted)]:
+                    add(value, index)
+
+    distance = 0
+    while distance < len(buckets):
+        for index in buckets[distance]:
+            side_to_move, squares = layout.get_position(index)
+            if side_to_move == BLACK_TO_MOVE:
+                for parent in layout.get_white_unmoves(squares):
+                    parent_index = layout.get_index(WHITE_TO_MOVE, parent)
+                    if not values[parent_index]:
+                        add(distance + 1, parent_index)
+            elif not values[index]:
+                # The first visit of a position with white to move is along its shortest mate
+                values[index] = distance + 1
+                for parent in layout.get_black_unmoves(squares):
+                    parent_index = layout.get_index(BLACK_TO_MOVE, parent)
+                    move_count = move_counts[parent_index]
+                    if move_count and move_count != ESCAPE:
+                        move_counts[parent_index] = move_count - 1
+                        if move_count == 1:
+                            # The last of black's moves to be refuted is its longest defence
+                            values[parent_index] = distance + 2
+                            add(distance + 1, parent_index)
+        buckets[distance] = []
+        distance += 1
+    return values
+
+def generate_tables(names: Iterable[str], verbose: bool = False) -> Dict[str, bytearray]:
+    """
+    Generates the named tables, along with the tables they promote into.
+    """
+    names = set(names)
+    if "KPK" in names:
+        names.update(PROMOTION_TABLES.values())
+    tables = {}
+    # TABLES lists every table after the ones it depends on
+    for name in TABLES:
+        if name in names:
+            start_time = time.perf_counter()
+            tables[name] = generate_table(name, tables)
+            if verbose:
+                longest = max(tables[name]) - 1
+                print(f"{name}: {len(tables[name]):,} positions in {time.perf_counter() - start_time:.1f}s, longest mate {longest} plies.")
+    return tables
+
+def write_tablebase(path: str, tables: Dict[str, bytes]) -> None:
+    offset = FILE_HEADER.size + TABLE_HEADER.size * len(tables)
+    with open(path, "wb") as tablebase_file:
+        tablebase_file.write(FILE_HEADER.pack(MAGIC, VERSION, len(tables)))
+        for name, values in tables.items():
+            tablebase_file.write(TABLE_HEADER.pack(name.encode("ascii"), offset, len(values)))
+            offset += len(values)
+        for values in tables.values():
+            tablebase_file.write(values)
+
+# Material of the strong side, in PIECE_TYPES order, for every table
+TABLES_BY_MATERIAL = {tuple(sorted(pieces, key=PIECE_TYPES.index)): name for name, pieces in TABLES.items()}
+# A lone minor piece cannot mate
+DRAWN_MATERIAL = ((), ("knight",), ("bishop",))
+
+class Tablebase:
+    """
+    Read-only view of a tablebase file through mmap. Probing a position covered by one of its tables costs one lookup.
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as tablebase_file:
+            header = tablebase_file.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size or FILE_HEADER.unpack(header)[:2] != (MAGIC, VERSION):
+                raise ValueError(f"Not a tablebase: {path}")
+            self.offsets = {}
+            self.layouts = {}
+            for _ in range(FILE_HEADER.unpack(header)[2]):
+                name, offset, size = TABLE_HEADER.unpack(tablebase_file.read(TABLE_HEADER.size))
+                name = name.rstrip(b"\0").decode("ascii")
+                self.layouts[name] = layout = TableLayout(name)
+                if size != layout.size:
+                    raise ValueError(f"Table {name} in {path} has the wrong size")
+                self.offsets[name] = offset
+            # The mapping stays valid after the file is closed
+            self.map = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self) -> Tablebase:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.map.close()
+
+    def probe(self, board: Board) -> Optional[TablebaseResult]:
+        """
+        Returns the result of the position with perfect play from both sides, or None if no table covers it. Positions
+        where castling is still possible are left to the search.
+        """
+        pieces = board.bitboards.pieces
+        for strong_color, weak_color in (("white", "black"), ("black", "white")):
+            weak_base, strong_base = PIECE_INDICES[(weak_color, "pawn")], PIECE_INDICES[(strong_color, "pawn")]
+            if any(pieces[weak_base:weak_base + 5]):
+                continue
+            material = tuple(piece_type for offset, piece_type in enumerate(PIECE_TYPES[:5]) for _ in range(pieces[strong_base + offset].bit_count()))
+            if material in DRAWN_MATERIAL:
+                return DRAW
+            name = TABLES_BY_MATERIAL.get(material)
+            if name not in self.layouts or board.get_castling_rights():
+                return None
+            # Tables are stored with white as the strong side, so black's positions are looked up upside down
+            mirror = 0 if strong_color == "white" else RANK_MIRROR
+            squares = (get_square(pieces[strong_base + 5]) ^ mirror, get_square(pieces[weak_base + 5]) ^ mirror)
+            squares += tuple(get_square(pieces[strong_base + PIECE_TYPES.index(piece_type)]) ^ mirror for piece_type in TABLES[name])
+            side_to_move = WHITE_TO_MOVE if board.current_turn == strong_color else BLACK_TO_MOVE
+            value = self.map[self.offsets[name] + self.layouts[name].get_index(side_to_move, squares)]
+            if not value:
+                return DRAW
+            return TablebaseResult(1 if side_to_move == WHITE_TO_MOVE else -1, value - 1)
+        return None
+
+    def best_move(self, board: Board) -> Optional['Move']:
+        """
+        Returns a move that keeps the best result: the quickest mate when winning, the longest defence when losing, and
+        a move that holds the draw otherwise. Returns None if no table covers the position.
+        """
+        result = self.probe(board)
+        if result is None:
+            return None
+        best_move, best_key = None, None
+        for move in generate_legal_moves(board, board.current_turn):
+            board.make_move(move)
+            try:
+                child = self.probe(board)
+            finally:
+                board.unmake_move()
+            if child is None:
+                continue
+            # Lower is better: a lost position for the opponent first, then a draw, with faster wins and slower losses
+            if child.wdl == -1:
+                key = (0, child.dtm)
+            elif child.wdl == 0:
+                key = (1, 0)
+            else:
+                key = (2, -child.dtm)
+            if best_key is None or key < best_key:
+                best_move, best_key = move, key
+        return best_move
+
+def get_square(bitboard: int) -> int:
+    return (bitboard & -bitboard).bit_length() - 1
+
+def load_default_tablebase() -> Optional[Tablebase]:
+    """
+    Opens the tablebase generated next to the engine, or returns None if it has not been generated.
+    """
+    return Tablebase(DEFAULT_TABLEBASE_PATH) if os.path.exists(DEFAULT_TABLEBASE_PATH) else None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases for small endings, or look up a position in them.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate", help="solve endings by retrograde analysis and write them to a file")
+    generate_parser.add_argument("tables", nargs="*", default=list(TABLES), choices=list(TABLES), help="endings to generate (all by default)")
+    generate_parser.add_argument("--output", default=DEFAULT_TABLEBASE_PATH, help="tablebase file to write")
+    probe_parser = subparsers.add_parser("probe", help="show the result and best move of a position")
+    probe_parser.add_argument("fen", help="position to look up")
+    probe_parser.add_argument("--tablebase", default=DEFAULT_TABLEBASE_PATH, help="tablebase file to read")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        tables = generate_tables(args.tables, verbose=True)
+        write_tablebase(args.output, tables)
+        print(f"Wrote {', '.join(tables)} to {args.output}.")
+    else:
+        board = Board.from_fen(args.fen)
+        with Tablebase(args.tablebase) as tablebase:
+            result = tablebase.probe(board)
+            if result is None:
+                print("Position not covered by the tablebase.")
+            else:
+                outcome = {1: "win", 0: "draw", -1: "loss"}[result.wdl]
+                print(f"{outcome}{f' in {result.dtm} plies' if result.dtm is not None else ''}, best move {tablebase.best_move(board)}")
+
+if __name__ == "__main__":
+    main()
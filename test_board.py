@@ -0,0 +1,117 @@
+import pytest
+from board import START_FEN, Board
+from move_generator import generate_legal_moves
+from perft import POSITIONS, perft
+
+def get_state(board: Board):
+    # The position and everything derived from it, for comparing boards exactly
+    return (board.to_fen(), board.zobrist_key, board.rights_key, board.score, list(board.bitboards.pieces), list(board.bitboards.attacks), len(board.key_history))
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_perft(name):
+    fen, node_counts = POSITIONS[name]
+    board = Board.from_fen(fen or START_FEN)
+    for depth in (1, 2, 3):
+        assert perft(board, board.current_turn, depth) == node_counts[depth - 1]
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_make_unmake_restores_position(name):
+    fen, _ = POSITIONS[name]
+    board = Board.from_fen(fen or START_FEN)
+    state = get_state(board)
+    # Two plies deep, so that en passant, castling rights and promotions are taken back in every order
+    for move in generate_legal_moves(board, board.current_turn):
+        board.make_move(move)
+        after_move = get_state(board)
+        for reply in generate_legal_moves(board, board.current_turn):
+            board.make_move(reply)
+            board.unmake_move()
+            assert get_state(board) == after_move
+        board.unmake_move()
+        assert get_state(board) == state
+
+@pytest.mark.parametrize("fen", [START_FEN] + [fen + " 0 1" for fen, _ in POSITIONS.values() if fen])
+def test_fen_round_trip(fen):
+    assert Board.from_fen(fen).to_fen() == fen
+
+@pytest.mark.parametrize("fen", [
+    "4k3/8/8/8/8/8/8/4K3 b - - 7 42",
+    "r3k2r/8/8/8/8/8/8/R3K2R b Kq - 5 9",
+    "rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3",
+])
+def test_fen_round_trip_with_rights_and_counters(fen):
+    board = Board.from_fen(START_FEN)
+    board.set_fen(fen)
+    assert board.to_fen() == fen
+    assert board.zobrist_key == Board.from_fen(fen).zobrist_key
+
+@pytest.mark.parametrize("fen", [
+    "bad fen",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN1 w KQkq - 0 1", # Castling right without its rook
+    "4k3/8/8/8/8/8/8/4K3 w - - x 1",
+    "4k3/8/8/8/8/8/8/4K3 w - e3 0 1", # En passant square without a pawn
+    "4k3/8/8/8/8/8/8/4KX2 w - - 0 1",
+    "4k3/8/8/8/8/8/8/4K4 w - - 0 1",
+    "8/8/8/8/8/8/8/8 w - - 0 1",
+    "4k3/8/8/8/8/8/8/3KK3 w - - 0 1",
+    "4k3/8/8/8/8/8/8/4R1K1 w - - 0 1", # Black, not to move, is in check
+])
+def test_invalid_fen_leaves_board_unchanged(fen):
+    board = Board.from_fen(START_FEN)
+    board.make_move(generate_legal_moves(board, "white")[0])
+    state = get_state(board)
+    with pytest.raises(ValueError):
+        board.set_fen(fen)
+    assert get_state(board) == state
+    assert len(board.undo_stack) == 1
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_incremental_key_matches_key_from_scratch(name):
+    fen, _ = POSITIONS[name]
+    board = Board.from_fen(fen or START_FEN)
+    for move in generate_legal_moves(board, board.current_turn):
+        board.make_move(move)
+        assert board.zobrist_key == board.compute_zobrist_key() ^ board.rights_key
+        # The same position set up from its FEN string gets the same key
+        assert board.zobrist_key == Board.from_fen(board.to_fen()).zobrist_key
+        board.unmake_move()
+
+def test_transposed_moves_give_same_key():
+    first = Board.from_fen(START_FEN)
+    second = Board.from_fen(START_FEN)
+    for board, moves in ((first, ("g1f3", "g8f6", "b1c3")), (second, ("b1c3", "g8f6", "g1f3"))):
+        for name in moves:
+            board.make_move(next(move for move in generate_legal_moves(board, board.current_turn) if str(move) == name))
+    assert first.zobrist_key == second.zobrist_key
+    assert first.to_fen().split()[:4] == second.to_fen().split()[:4]
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_restore_snapshot(name):
+    fen, _ = POSITIONS[name]
+    board = Board.from_fen(fen or START_FEN)
+    board.make_move(generate_legal_moves(board, board.current_turn)[0])
+    state = get_state(board)
+    pieces = list(board.white_player.pieces + board.black_player.pieces)
+    snapshot = board.get_snapshot()
+    # Captures and promotions first, so that pieces leave the board and pawns are replaced
+    for _ in range(6):
+        moves = generate_legal_moves(board, board.current_turn)
+        if not moves:
+            break
+        board.make_move(max(moves, key=lambda move: (move.promotion is not None, board.get_piece_at(move.dest) is not None)))
+    board.restore_snapshot(snapshot)
+    assert get_state(board) == state
+    assert board.white_player.pieces + board.black_player.pieces == pieces
+    # The moves made before the snapshot can still be taken back
+    board.unmake_move()
+    assert board.to_fen() == Board.from_fen(fen or START_FEN).to_fen()
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_incremental_score_matches_score_from_scratch(name):
+    fen, _ = POSITIONS[name]
+    board = Board.from_fen(fen or START_FEN)
+    for move in generate_legal_moves(board, board.current_turn):
+        board.make_move(move)
+        assert board.score == board.compute_score()
+        board.unmake_move()
@@ -0,0 +1,47 @@
+import pytest
+from board import START_FEN, Board
+from game_database import GameDatabase, GameDatabaseWriter, replay_games
+from move_generator import generate_legal_moves
+
+def play_moves(names):
+    board = Board.from_fen(START_FEN)
+    moves = []
+    for name in names:
+        move = next(move for move in generate_legal_moves(board, board.current_turn) if str(move) == name)
+        board.make_move(move)
+        moves.append(move)
+    return moves, board.to_fen()
+
+GAMES = [(("e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6", "h5f7"), "white"), (("d2d4", "d7d5"), None), ((), "draw")]
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = str(tmp_path / "games.db")
+    with GameDatabaseWriter(path) as writer:
+        for names, result in GAMES:
+            writer.add_game(play_moves(names)[0], result)
+    return path
+
+def test_games_read_back(database_path):
+    with GameDatabase(database_path) as database:
+        assert len(database) == len(GAMES)
+        for number, (names, result) in enumerate(GAMES):
+            stored_result, moves = database.get_game(number)
+            assert (stored_result, [str(move) for move in moves]) == (result, list(names))
+        replayed = [(result, board.to_fen()) for result, board in replay_games(database)]
+        assert replayed == [(result, play_moves(names)[1]) for names, result in GAMES]
+
+def test_close_after_early_exit(database_path):
+    with GameDatabase(database_path) as database:
+        for result, codes in database:
+            assert (result, len(codes)) == ("white", 7)
+            break
+    with GameDatabase(database_path) as database:
+        for result, board in replay_games(database):
+            break
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a game database")
+    with pytest.raises(ValueError):
+        GameDatabase(str(path))
@@ -0,0 +1,48 @@
+import io
+from board import START_FEN, Board
+from pgn import read_games, replay_game, validate_file
+
+PGN = """[Event "Legal"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 {Threatens mate} Nf6 (3... g6) 4. Qxf7# 1-0
+
+[Event "Bad FEN"]
+[FEN "bad fen"]
+[Result "*"]
+
+1. e4 *
+
+[Event "Illegal move"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+
+[Event "From a FEN"]
+[FEN "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"]
+[Result "*"]
+
+1. e4 Kd7 2. e5 *
+"""
+
+def test_read_games():
+    games = list(read_games(io.StringIO(PGN)))
+    assert [game.headers["Event"] for game in games] == ["Legal", "Bad FEN", "Illegal move", "From a FEN"]
+    assert games[0].moves == ["e4", "e5", "Qh5", "Nc6", "Bc4", "Nf6", "Qxf7#"]
+    assert games[0].result == "1-0"
+
+def test_replay_flags_bad_games_and_continues():
+    board = Board.from_fen(START_FEN)
+    legal, bad_fen, illegal, from_fen = read_games(io.StringIO(PGN))
+    assert replay_game(board, legal) is None
+    bad_fen_report = replay_game(board, bad_fen)
+    assert bad_fen_report.ply == 0 and "bad fen" in bad_fen_report.reason
+    illegal_report = replay_game(board, illegal)
+    assert (illegal_report.ply, illegal_report.san) == (3, "Ke3")
+    assert replay_game(board, from_fen) is None
+    assert board.to_fen() == "8/3k4/8/4P3/8/8/8/4K3 b - - 0 2"
+
+def test_validate_file(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    assert validate_file(str(path), verbose=False) == 2
@@ -0,0 +1,51 @@
+import pytest
+import player
+from board import START_FEN, Board
+from move_generator import generate_legal_moves
+from player import Player
+from pondering import Ponderer
+from transposition_table import TranspositionTable
+
+@pytest.fixture
+def board():
+    cpu = Player("white", "black", True, "easy")
+    board = Board.from_fen(START_FEN, black_player=cpu)
+    cpu.ponderer = Ponderer(cpu)
+    return board
+
+def ponder_to_end(board: Board) -> Ponderer:
+    ponderer = board.black_player.ponderer
+    ponderer.start(board)
+    ponderer.thread.join()
+    return ponderer
+
+def test_ponders_into_replaced_table(board):
+    cpu = board.black_player
+    cpu.transposition_table = TranspositionTable(1)
+    ponderer = ponder_to_end(board)
+    assert ponderer.transposition_table is cpu.transposition_table
+    assert cpu.transposition_table.probe(ponderer.ponder_key) is not None
+
+def test_predicted_reply_reuses_ponder_result(board, monkeypatch):
+    ponderer = ponder_to_end(board)
+    assert ponderer.best_move is not None
+    board.make_move(ponderer.predicted_move)
+    monkeypatch.setattr(player, "Search", None) # Any search would fail
+    assert board.black_player.choose_cpu_move() == ponderer.best_move
+    assert (ponderer.hits, ponderer.misses) == (1, 0)
+
+def test_mispredicted_reply_searches_again(board, monkeypatch):
+    ponderer = ponder_to_end(board)
+    board.make_move(next(move for move in generate_legal_moves(board, "white") if move != ponderer.predicted_move))
+    searches = []
+
+    class RecordingSearch(player.Search):
+        def find_best_move(self):
+            searches.append(self.board.zobrist_key)
+            return super().find_best_move()
+
+    monkeypatch.setattr(player, "Search", RecordingSearch)
+    move = board.black_player.choose_cpu_move()
+    assert move in generate_legal_moves(board, "black")
+    assert searches == [board.zobrist_key]
+    assert (ponderer.hits, ponderer.misses) == (0, 1)
@@ -0,0 +1,19 @@
+from board import Board
+from move_generator import generate_legal_moves
+from search import Search, SearchLimits
+
+def play(board: Board, *names: str) -> None:
+    for name in names:
+        board.make_move(next(move for move in generate_legal_moves(board, board.current_turn) if str(move) == name))
+
+def test_finds_mate_in_one():
+    board = Board.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    assert str(Search(board, limits=SearchLimits(max_depth=3)).find_best_move()) == "a1a8"
+
+def test_repetition_of_game_position_is_a_draw():
+    # Black is a queen down, but the king going back to g8 repeats a position of the game
+    board = Board.from_fen("7k/8/8/8/8/8/2Q5/K7 b - - 0 1")
+    play(board, "h8g8", "c2d2", "g8h8", "d2c2")
+    search = Search(board, limits=SearchLimits(max_depth=3))
+    assert str(search.find_best_move()) == "h8g8"
+    assert search.score == 0
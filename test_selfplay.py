@@ -0,0 +1,23 @@
+import json
+from game import Game
+from selfplay import read_selfplay_games
+
+MOVES = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "e1g1", "f8c5"]
+
+def test_castling_written_as_uci():
+    game = Game()
+    for text in MOVES:
+        game.push(text)
+    fen = game.board.to_fen()
+    assert game.get_uci_moves() == MOVES
+    # The board is back where it was after the conversion
+    assert game.board.to_fen() == fen
+
+def test_read_selfplay_games(tmp_path):
+    game = Game()
+    for text in MOVES:
+        game.push(text)
+    path = tmp_path / "games.jsonl"
+    # The second record uses the engine's own notation for castling, king onto rook
+    path.write_text(json.dumps({"moves": MOVES, "result": "white"}) + "\n" + json.dumps({"moves": [str(move) for move in game.moves], "result": "unfinished"}) + "\n")
+    assert list(read_selfplay_games(str(path))) == [(game.moves, "white"), (game.moves, "unfinished")]
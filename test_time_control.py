@@ -0,0 +1,58 @@
+import pytest
+import time_control
+from search import SearchLimits
+from time_control import GameClock, TimeManager
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake_time = FakeTime()
+    monkeypatch.setattr(time_control, "time", fake_time)
+    return fake_time
+
+def test_clock_runs_for_side_to_move_only(fake_time):
+    clock = GameClock(60, increment=2)
+    clock.start("white")
+    fake_time.now += 10
+    assert clock.get_remaining("white") == 50
+    assert clock.get_remaining("black") == 60
+    assert clock.stop() == 10
+    # The increment is added once the move is made
+    assert clock.get_remaining("white") == 52
+    fake_time.now += 30
+    assert clock.get_remaining("white") == 52
+
+def test_clock_flag_falls_without_increment(fake_time):
+    clock = GameClock(5, increment=2)
+    clock.start("black")
+    fake_time.now += 6
+    assert clock.is_flagged("black")
+    clock.stop()
+    assert clock.get_remaining("black") == -1
+    assert clock.format("black") == "00:00.0"
+
+def test_clock_format_rounds_down(fake_time):
+    clock = GameClock(299.97)
+    assert clock.format("white") == "04:59.9"
+    assert GameClock(61.25).format("white") == "01:01.2"
+
+def test_time_manager_keeps_difficulty_limits():
+    limits = TimeManager().get_limits(60, 0, SearchLimits(max_nodes=1000, max_depth=3))
+    assert limits.max_nodes == 1000 and limits.max_depth == 3
+    assert 0 < limits.soft_time <= limits.max_time
+
+@pytest.mark.parametrize("remaining, increment", [(300, 0), (60, 2), (1, 0), (0.5, 5), (0, 0)])
+def test_time_manager_stays_within_clock(remaining, increment):
+    limits = TimeManager().get_limits(remaining, increment)
+    assert 0 <= limits.soft_time <= limits.max_time <= max(0.0, remaining - time_control.SAFETY_MARGIN)
+
+def test_time_manager_spends_more_with_more_time():
+    manager = TimeManager()
+    assert manager.get_limits(300).soft_time > manager.get_limits(60).soft_time
+    assert manager.get_limits(60, 2).soft_time > manager.get_limits(60).soft_time
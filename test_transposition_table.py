@@ -0,0 +1,69 @@
+import pytest
+from move import Move
+from transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, SharedTableResizeError, SharedTranspositionTable, TranspositionTable
+
+def get_colliding_keys(count: int):
+    # Keys that map to the same bucket
+    return [1 + (index << 40) for index in range(count)]
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    table.store(12345, 4, -87, LOWER_BOUND, Move(12, 28))
+    assert table.probe(12345) == (4, -87, LOWER_BOUND, Move(12, 28))
+    assert table.probe(54321) is None
+
+def test_best_move_kept_when_stored_without_one():
+    table = TranspositionTable(1)
+    table.store(12345, 4, 10, EXACT, Move(12, 28))
+    table.store(12345, 5, 20, UPPER_BOUND)
+    assert table.probe(12345).best_move == Move(12, 28)
+
+def test_deeper_entry_kept_in_depth_preferred_slot():
+    table = TranspositionTable(1)
+    deep, shallow, newer = get_colliding_keys(3)
+    table.store(deep, 8, 1, EXACT)
+    table.store(shallow, 2, 2, EXACT)
+    table.store(newer, 3, 3, EXACT)
+    # The shallower results share the always-replace slot, the newest one winning
+    assert table.probe(deep).depth == 8
+    assert table.probe(shallow) is None
+    assert table.probe(newer).depth == 3
+
+def test_stale_entry_replaced_by_new_search():
+    table = TranspositionTable(1)
+    old, new = get_colliding_keys(2)
+    table.store(old, 8, 1, EXACT)
+    table.new_search()
+    table.store(new, 1, 2, EXACT)
+    assert table.probe(new).depth == 1
+    assert table.probe(old) is None
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(12345, 4, 10, EXACT)
+    table.clear()
+    assert table.probe(12345) is None
+    assert table.get_size_mb() == 1
+
+def test_resize_drops_entries():
+    table = TranspositionTable(1)
+    table.store(12345, 4, 10, EXACT)
+    table.resize(2)
+    assert table.get_size_mb() == 2
+    assert table.probe(12345) is None
+
+def test_shared_table_seen_by_attached_table():
+    owner = SharedTranspositionTable(1)
+    attached = SharedTranspositionTable(name=owner.name)
+    try:
+        owner.new_search()
+        owner.store(12345, 4, -87, LOWER_BOUND, Move(12, 28))
+        assert attached.probe(12345) == (4, -87, LOWER_BOUND, Move(12, 28))
+        assert attached.age == owner.age == 1
+        attached.clear()
+        assert owner.probe(12345) is None
+        with pytest.raises(SharedTableResizeError):
+            owner.resize(2)
+    finally:
+        attached.close()
+        owner.close()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import time
+from typing import Optional
+from search import SearchLimits
+
+MOVES_TO_GO = 30 # Moves the remaining time is assumed to have to last, however far the game has gone
+INCREMENT_SHARE = 0.8 # Part of the increment spent on the move it is added for
+MAX_TIME_SHARE = 0.4 # Most of the remaining clock that a single move may ever take
+HARD_LIMIT_FACTOR = 3 # Hard limit as a multiple of the planned time, for when the best move keeps changing
+SAFETY_MARGIN = 0.05 # Seconds kept back for the move to reach the clock
+
+class GameClock:
+    """
+    Chess clock with a base time and an increment added after every move, in seconds.
+    """
+    def __init__(self, base_time: float, increment: float = 0.0) -> None:
+        self.base_time = base_time
+        self.increment = increment
+        self.remaining = {"white": base_time, "black": base_time}
+        self.running_color: Optional[str] = None
+        self.turn_start_time = 0.0
+
+    def start(self, color: str) -> None:
+        self.running_color = color
+        self.turn_start_time = time.perf_counter()
+
+    def stop(self) -> float:
+        """
+        Stops the running side's clock, adds the increment unless its time ran out, and returns the time the move took.
+        """
+        color = self.running_color
+        elapsed = time.perf_counter() - self.turn_start_time
+        self.remaining[color] -= elapsed
+        if self.remaining[color] > 0:
+            self.remaining[color] += self.increment
+        self.running_color = None
+        return elapsed
+
+    def get_remaining(self, color: str) -> float:
+        remaining = self.remaining[color]
+        if color == self.running_color:
+            remaining -= time.perf_counter() - self.turn_start_time
+        return remaining
+
+    def is_flagged(self, color: str) -> bool:
+        return self.get_remaining(color) <= 0
+
+    def format(self, color: str) -> str:
+        # Whole tenths, rounded down so that 59.97 seconds does not show as 60.0
+        minutes, tenths = divmod(int(max(0.0, self.get_remaining(color)) * 10), 600)
+        return f"{minutes:02}:{tenths // 10:02}.{tenths % 10}"
+
+class TimeManager:
+    """
+    Turns the time left on a clock into search limits for one move. The planned time is an even share of the remaining
+    time plus most of the increment. The search may run past it up to a hard limit while its best move is unstable (see
+    SearchLimits.soft_time), and forced moves are played without searching.
+    """
+    def __init__(self, moves_to_go: int = MOVES_TO_GO) -> None:
+        self.moves_to_go = moves_to_go
+
+    def get_limits(self, remaining: float, increment: float = 0.0, limits: SearchLimits = SearchLimits()) -> SearchLimits:
+        """
+        Returns limits with the time budget for the next move. The node and depth limits of the given limits (such as
+        a difficulty's) are kept, while their time limit is replaced.
+        """
+        available = max(0.0, remaining - SAFETY_MARGIN)
+        planned = available / self.moves_to_go + increment * INCREMENT_SHARE
+        hard_limit = min(planned * HARD_LIMIT_FACTOR, available * MAX_TIME_SHARE + increment * INCREMENT_SHARE, available)
+        planned = min(planned, hard_limit)
+        return limits._replace(max_time=hard_limit, soft_time=planned)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+from array import array
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional
+from move import Move
+
+EXACT = 0
+LOWER_BOUND = 1 # The score failed high, the real score is at least this high
+UPPER_BOUND = 2 # The score failed low, the real score is at most this high
+BYTES_PER_SLOT = 16 # One 64-bit key and one 64-bit data word
+SLOTS_PER_BUCKET = 2 # A depth-preferred slot followed by an always-replace slot
+SCORE_OFFSET = 1 << 15
+NO_MOVE = 0xFFFF
+HEADER_WORDS = 2 # Words in front of the slots of a SharedTranspositionTable
+
+class TTEntry(NamedTuple):
+    depth: int
+    score: int
+    bound: int
+    best_move: Optional[Move]
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Board.zobrist_key. Entries are packed into two preallocated arrays,
+    so memory use is set by size_mb and never grows, however many positions or games are searched.
+
+    Each bucket holds a depth-preferred slot, which is only overwritten by a search at least as deep or by a result from
+    an older search, and an always-replace slot, which takes every other result.
+    """
+    def __init__(self, size_mb: float = 16) -> None:
+        self.allocate(get_num_buckets(size_mb))
+
+    def allocate(self, num_buckets: int) -> None:
+        self.bucket_mask = num_buckets - 1
+        self.keys = array("Q", bytes(8 * num_buckets * SLOTS_PER_BUCKET))
+        self.data = array("Q", bytes(8 * num_buckets * SLOTS_PER_BUCKET))
+        self.age = 0
+
+    def resize(self, size_mb: float) -> None:
+        # Every entry is dropped, since the bucket of a key depends on the number of buckets
+        self.allocate(get_num_buckets(size_mb))
+
+    def clear(self) -> None:
+        self.allocate(self.bucket_mask + 1)
+
+    def get_size_mb(self) -> float:
+        return len(self.keys) * BYTES_PER_SLOT / (1024 * 1024)
+
+    def new_search(self) -> None:
+        # Entries written by earlier searches lose their protection in the depth-preferred slots
+        self.age = (self.age + 1) & 0xFF
+
+    def store(self, key: int, depth: int, score: int, bound: int, best_move: Optional[Move] = None) -> None:
+        slot = (key & self.bucket_mask) * SLOTS_PER_BUCKET
+        keys, data = self.keys, self.data
+        # Keys are stored XORed with their data word, so that an entry torn by two processes writing it at once
+        # (see SharedTranspositionTable) no longer matches its key and is ignored
+        first_data, second_data = data[slot], data[slot + 1]
+        first_key = keys[slot] ^ first_data
+        if best_move is not None:
+            best_move_code = best_move.encode()
+        elif first_key == key:
+            # Keep the best move found by an earlier search of the same position
+            best_move_code = (first_data >> 26) & 0xFFFF
+        elif keys[slot + 1] ^ second_data == key:
+            best_move_code = (second_data >> 26) & 0xFFFF
+        else:
+            best_move_code = NO_MOVE
+        is_stale = (first_data >> 42) != self.age
+        if not (first_key == key or first_data == 0 or is_stale or depth >= (first_data >> 16) & 0xFF):
+            slot += 1
+        entry = (max(-SCORE_OFFSET, min(SCORE_OFFSET - 1, score)) + SCORE_OFFSET) | (min(depth, 0xFF) << 16) | (bound << 24) | (best_move_code << 26) | (self.age << 42)
+        data[slot] = entry
+        keys[slot] = key ^ entry
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        slot = (key & self.bucket_mask) * SLOTS_PER_BUCKET
+        for slot in (slot, slot + 1):
+            data = self.data[slot]
+            if self.keys[slot] ^ data == key and data:
+                best_move_code = (data >> 26) & 0xFFFF
+                return TTEntry((data >> 16) & 0xFF, (data & 0xFFFF) - SCORE_OFFSET, (data >> 24) & 0x3, None if best_move_code == NO_MOVE else Move.decode(best_move_code))
+        return None
+
+    def get_usage(self) -> float:
+        """
+        Returns the fraction of the first 1000 slots that hold an entry from the current search.
+        """
+        sample = min(1000, len(self.keys))
+        return sum(1 for slot in range(sample) if self.data[slot] and self.data[slot] >> 42 == self.age) / sample
+
+class SharedTableResizeError(RuntimeError):
+    pass
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table whose arrays live in a multiprocessing.shared_memory block, so that processes searching at the
+    same time read and write the same entries without locks. The process that creates the table owns it: it alone starts
+    new searches and unlinks the block when closing. Other processes attach to the block by its name.
+
+    The size is fixed when the table is created. Resizing would need a new block, which the attached processes would
+    not see, so resize() raises SharedTableResizeError; create a new table (and new helper processes) instead.
+    """
+    def __init__(self, size_mb: float = 16, name: Optional[str] = None) -> None:
+        self.is_owner = name is None
+        if self.is_owner:
+            num_slots = get_num_buckets(size_mb) * SLOTS_PER_BUCKET
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=8 * HEADER_WORDS + BYTES_PER_SLOT * num_slots)
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name=name)
+        buffer = self.shared_memory.buf
+        # Age and number of slots, then the keys and the data words
+        self.header = buffer[:8 * HEADER_WORDS].cast("Q")
+        if self.is_owner:
+            self.header[1] = num_slots
+        num_slots = self.header[1]
+        self.keys = buffer[8 * HEADER_WORDS:8 * (HEADER_WORDS + num_slots)].cast("Q")
+        self.data = buffer[8 * (HEADER_WORDS + num_slots):8 * (HEADER_WORDS + 2 * num_slots)].cast("Q")
+        self.bucket_mask = num_slots // SLOTS_PER_BUCKET - 1
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    @property
+    def age(self) -> int:
+        return self.header[0]
+
+    def resize(self, size_mb: float) -> None:
+        raise SharedTableResizeError(f"Cannot resize shared transposition table {self.name}: the processes attached to it would keep using the old block")
+
+    def clear(self) -> None:
+        buffer = self.shared_memory.buf
+        buffer[8 * HEADER_WORDS:8 * HEADER_WORDS + 2 * 8 * len(self.keys)] = bytes(2 * 8 * len(self.keys))
+
+    def new_search(self) -> None:
+        if self.is_owner:
+            self.header[0] = (self.header[0] + 1) & 0xFF
+
+    def close(self) -> None:
+        # Views of the block must be released before it can be closed
+        for view in (self.header, self.keys, self.data):
+            view.release()
+        self.shared_memory.close()
+        if self.is_owner:
+            self.shared_memory.unlink()
+
+def get_num_buckets(size_mb: float) -> int:
+    num_buckets = max(1, int(size_mb * 1024 * 1024) // (BYTES_PER_SLOT * SLOTS_PER_BUCKET))
+    # Round down to a power of two so that the bucket can be taken from the low bits of the key
+    return 1 << (num_buckets.bit_length() - 1)
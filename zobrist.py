@@ -0,0 +1,14 @@
+from __future__ import annotations
+import random
+from bitboard import NUM_SQUARES, PIECE_INDICES
+
+# A fixed seed keeps the keys identical between runs, so that hashes can be stored on disk
+ZOBRIST_SEED = 0x5EED
+_random = random.Random(ZOBRIST_SEED)
+
+PIECE_KEYS = [[_random.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in range(len(PIECE_INDICES))]
+SIDE_KEY = _random.getrandbits(64) # Included when black is to move
+CASTLING_KEYS = {right: _random.getrandbits(64) for right in "KQkq"}
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)] # One per file
+# Castling right, king square and rook square that must both hold unmoved pieces for the right to exist
+CASTLING_SQUARES = (("K", 4, 7), ("Q", 4, 0), ("k", 60, 63), ("q", 60, 56))